@@ -13,6 +13,7 @@ export default function Component3() {
   const pollRef = useRef(null);
   const [perspectivesByColor, setPerspectivesByColor] = useState({});
   const wsRef = useRef(null);
+  const jobIdRef = useRef(null); // job_id returned by /run; scopes status, results and the WebSocket
   const [showWhyModal, setShowWhyModal] = useState(false);
   const [selectedPerspectives, setSelectedPerspectives] = useState([]);
   const [cacheAvailable, setCacheAvailable] = useState(false);
@@ -38,48 +39,63 @@ export default function Component3() {
   setShowChart(false);
   setRevealedColors([]);
 
-    // Open WebSocket connection to the orchestrator
+    // Close any socket left over from a previous run
     if (wsRef.current) {
       wsRef.current.close();
     }
-    
+    jobIdRef.current = null;
+
+    // Trigger pipeline through the orchestrator's /run endpoint; everything
+    // after this is scoped to the returned job_id, so runs started by other
+    // analysts never show up here
+    const orchestratorPort = 8001;  // Updated to match orchestrator running on port 8001
+    try {
+      const response = await fetch(`http://localhost:${orchestratorPort}/run`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({}), // Any additional data can go here
+      });
+      if (!response.ok) {
+        console.error('Failed to start pipeline:', response.status, response.statusText);
+        setError(`Pipeline start failed: ${response.status}`);
+        setStage('error');
+        return;
+      }
+      const { job_id: jobId } = await response.json();
+      jobIdRef.current = jobId;
+      console.log(`Pipeline started successfully through orchestrator as job ${jobId}`);
+    } catch (err) {
+      console.error('Error starting pipeline:', err);
+      setError(`Cannot reach orchestrator: ${err.message}`);
+      setStage('error');
+      return;
+    }
+
+    // The job's WebSocket replays perspectives cached before it connected
+    connectPerspectives(jobIdRef.current);
+    // Start polling for status updates
+    beginPolling();
+  };
+
+  // Open the job's perspective WebSocket
+  const connectPerspectives = (jobId) => {
     try {
       console.log('Attempting to connect to orchestrator WebSocket...');
-      
-      // Connect to the orchestrator's WebSocket endpoint
       const orchestratorPort = 8001;  // Updated to match orchestrator running on port 8001
-      const ws = new WebSocket(`ws://localhost:${orchestratorPort}/ws/perspectives`);
+      const ws = new WebSocket(`ws://localhost:${orchestratorPort}/ws/perspectives/${jobId}`);
       wsRef.current = ws;
-      
+
       ws.onopen = () => {
         console.log('WebSocket connected successfully to orchestrator!');
-        // Trigger pipeline through the orchestrator's /run endpoint
-        fetch(`http://localhost:${orchestratorPort}/run`, { 
-          method: 'POST',
-          headers: {
-            'Content-Type': 'application/json',
-          },
-          body: JSON.stringify({}), // Any additional data can go here
-        }).then(response => {
-          if (!response.ok) {
-            console.error('Failed to start pipeline:', response.status, response.statusText);
-            setError(`Pipeline start failed: ${response.status}`);
-          } else {
-            console.log('Pipeline started successfully through orchestrator');
-            // Start polling for status updates
-            beginPolling();
-          }
-        }).catch(err => {
-          console.error('Error starting pipeline:', err);
-          setError(`Cannot reach orchestrator: ${err.message}`);
-        });
       };
-      
+
       ws.onmessage = (event) => {
         try {
           console.log('WebSocket message received from orchestrator:', event.data);
           const data = JSON.parse(event.data);
-          
+
           // Handle perspective data
           if (data.color && Array.isArray(data.perspectives)) {
             console.log(`Received ${data.perspectives.length} perspectives for color ${data.color}`);
@@ -101,21 +117,20 @@ export default function Component3() {
           console.warn('WebSocket message parse error:', e, event.data);
         }
       };
-      
+
       ws.onerror = (e) => {
         console.error('WebSocket error:', e);
         setError(`WebSocket error: ${e.message || 'Connection failed'}`);
         // Don't set stage to error here, as we're still polling for status
       };
-      
+
       ws.onclose = (e) => {
         console.log('WebSocket closed:', e.code, e.reason);
       };
     } catch (wsError) {
       console.error('Error creating WebSocket:', wsError);
       setError(`WebSocket initialization error: ${wsError.message}`);
-      // Continue with polling even if WebSocket fails
-      beginPolling();
+      // Polling still delivers the results if the WebSocket fails
     }
   };
 
@@ -127,50 +142,14 @@ export default function Component3() {
     pollRef.current = setInterval(async () => {
       try {
         const orchestratorPort = 8001;  // Updated to match orchestrator running on port 8001
-        const res = await fetch(`http://localhost:${orchestratorPort}/status`);
+        const res = await fetch(`http://localhost:${orchestratorPort}/status/${jobIdRef.current}`);
         const data = await res.json();
         
         // Update component state based on orchestrator response
         setStage(data.stage || 'idle');
         setProgress(data.progress || 0);
         
-        // Check if we're processing - if so, let's manually request any cached perspectives
-        if (data.stage === 'module3' && data.progress > 0) {
-          try {
-            // Request the current perspective cache
-            const cacheRes = await fetch(`http://localhost:${orchestratorPort}/ws/cache`);
-            if (cacheRes.ok) {
-              const cacheData = await cacheRes.json();
-              console.log("Received perspective cache:", Object.keys(cacheData));
-              
-              // Update our local state with any perspectives
-              Object.entries(cacheData).forEach(([color, perspectives]) => {
-                if (Array.isArray(perspectives) && perspectives.length > 0) {
-                  // Check if we already have this color's perspectives
-                  const existingPerspectives = perspectivesByColor[color] || [];
-                  if (existingPerspectives.length !== perspectives.length) {
-                    console.log(`Received ${perspectives.length} ${color} perspectives from cache`);
-                    setPerspectivesByColor(prev => ({
-                      ...prev,
-                      [color]: perspectives
-                    }));
-                  }
-                }
-              });
-              
-              // Special handling for violet if it's the last one
-              if (cacheData.violet && Array.isArray(cacheData.violet) && cacheData.violet.length > 0) {
-                console.log(`Ensuring violet perspectives are displayed: ${cacheData.violet.length} items`);
-                setPerspectivesByColor(prev => ({
-                  ...prev,
-                  violet: cacheData.violet
-                }));
-              }
-            }
-          } catch (cacheError) {
-            console.warn('Error fetching perspective cache:', cacheError);
-          }
-        }
+        // Perspectives arrive over the WebSocket as each color finishes; no cache polling needed
         
         if (data.error) {
           setError(data.error);
@@ -222,7 +201,7 @@ export default function Component3() {
     try {
       // Fetch main results from orchestrator
       const orchestratorPort = 8001;  // Updated to match orchestrator running on port 8001
-      const res = await fetch(`http://localhost:${orchestratorPort}/results`);
+      const res = await fetch(`http://localhost:${orchestratorPort}/results/${jobIdRef.current}`);
       
       if (!res.ok) {
         throw new Error(`Results not ready (${res.status}): ${res.statusText}`);
@@ -260,55 +239,15 @@ export default function Component3() {
         console.log('WebSocket reconnection attempt to orchestrator...');
         // Implement exponential backoff for reconnection
         setTimeout(() => {
-          if (wsRef.current?.readyState === WebSocket.CLOSED) {
-            try {
-              const orchestratorPort = 8000;  // Update this to match your orchestrator port
-              const ws = new WebSocket(`ws://localhost:${orchestratorPort}/ws/perspectives`);
-              wsRef.current = ws;
-              
-              ws.onopen = () => {
-                console.log('WebSocket reconnected successfully to orchestrator!');
-              };
-              
-              ws.onmessage = (event) => {
-                try {
-                  console.log('WebSocket message received from orchestrator:', event.data);
-                  const data = JSON.parse(event.data);
-                  
-                  // Handle perspective data
-                  if (data.color && Array.isArray(data.perspectives)) {
-                    console.log(`Received ${data.perspectives.length} perspectives for color ${data.color}`);
-                    setPerspectivesByColor(prev => ({
-                      ...prev,
-                      [data.color]: data.perspectives
-                    }));
-                  } 
-                  // Handle ping messages
-                  else if (data.type === "ping") {
-                    console.log("Received ping from orchestrator");
-                  }
-                  else {
-                    console.warn('Received message with unexpected format:', data);
-                  }
-                } catch (e) {
-                  console.warn('WebSocket message parse error:', e, event.data);
-                }
-              };
-              
-              ws.onerror = (e) => {
-                console.error('WebSocket reconnection error:', e);
-              };
-              
-              ws.onclose = (e) => {
-                console.log('Reconnected WebSocket closed:', e.code, e.reason);
-                // Schedule another reconnect attempt if still processing
-                if (stage !== 'idle' && stage !== 'error' && stage !== 'done') {
-                  reconnectWebSocket();
-                }
-              };
-            } catch (wsError) {
-              console.error('Error during WebSocket reconnection to orchestrator:', wsError);
-            }
+          if (wsRef.current?.readyState === WebSocket.CLOSED && jobIdRef.current) {
+            console.log('Reconnecting WebSocket to orchestrator...');
+            connectPerspectives(jobIdRef.current);
+            wsRef.current.addEventListener('close', () => {
+              // Schedule another reconnect attempt if still processing
+              if (stage !== 'idle' && stage !== 'error' && stage !== 'done') {
+                reconnectWebSocket();
+              }
+            });
           }
         }, 3000); // Wait 3 seconds before reconnecting
       }
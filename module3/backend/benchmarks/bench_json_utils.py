@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for json_utils.parse_model_output on malformed model output.
+
+Compares the single-pass, string-aware recovery scanner against the previous
+implementation, which restarted a brace-depth scan from every '{'. Run from
+module3/backend:
+
+    python benchmarks/bench_json_utils.py
+"""
+
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.json_utils import parse_model_output
+
+
+def legacy_concatenated_scan(raw_clean):
+    """Previous concatenated-object fallback (quadratic, not string-aware)."""
+    objects = []
+    pos = 0
+    while pos < len(raw_clean):
+        start = raw_clean.find('{', pos)
+        if start == -1:
+            break
+        depth = 0
+        end = start
+        for i in range(start, len(raw_clean)):
+            if raw_clean[i] == '{':
+                depth += 1
+            elif raw_clean[i] == '}':
+                depth -= 1
+                if depth == 0:
+                    end = i
+                    break
+        if depth == 0:
+            try:
+                obj = json.loads(raw_clean[start:end + 1])
+                if isinstance(obj, dict):
+                    objects.append(obj)
+            except json.JSONDecodeError:
+                pass
+        pos = end + 1
+    return objects
+
+
+def make_response(target_bytes=8192, unclosed=False):
+    """Concatenated perspective objects whose texts contain unbalanced braces."""
+    parts = []
+    size = 0
+    i = 0
+    while size < target_bytes:
+        obj = json.dumps({
+            "color": "red",
+            "bias_x": round(i / 100, 4),
+            "significance_y": 0.5,
+            "text": f"Perspective {i} opens a {{ brace and quotes \"{{}}\" inside text",
+        })
+        parts.append(obj)
+        size += len(obj)
+        i += 1
+    raw = "".join(parts)
+    # An unterminated leading object forces the legacy scan to restart from every '{'
+    return ("{\"color\": \"red\", " + raw) if unclosed else raw
+
+
+def main():
+    for label, raw in (
+        ("concatenated 8KB", make_response()),
+        ("unclosed lead 8KB", make_response(unclosed=True)),
+    ):
+        n = 50
+        legacy = timeit.timeit(lambda: legacy_concatenated_scan(raw.strip()), number=n) / n
+        current = timeit.timeit(lambda: parse_model_output(raw), number=n) / n
+        recovered_legacy = len(legacy_concatenated_scan(raw.strip()))
+        recovered_current = len(parse_model_output(raw))
+        print(
+            f"{label:<20} legacy {legacy * 1e3:8.3f} ms ({recovered_legacy} objs)   "
+            f"current {current * 1e3:8.3f} ms ({recovered_current} objs)   "
+            f"speedup {legacy / current:6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
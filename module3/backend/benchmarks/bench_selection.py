@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the stratified selection in TOP-N_K_MEANS-CLUSTERING.py.
+
+Times a batch of topics through stratified_selection_batch (perspective
+dicts) and stratified_selection_indices (bias/significance arrays) against a
+loop over stratified_selection_and_distribution (the per-topic path callers
+use), and checks that all three pick the same perspectives. Run from
+module3/backend:
+
+    python benchmarks/bench_selection.py
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.clustering import (
+    stratified_selection_and_distribution, stratified_selection_batch, stratified_selection_indices
+)
+
+
+def python_selection(perspectives):
+    """Per-topic selection as callers run it, with its progress messages suppressed."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        left, right, common = stratified_selection_and_distribution(perspectives)
+    return left, common, right
+
+
+def make_topics(num_topics, size, seed=0):
+    rng = random.Random(seed)
+    return [
+        [{'bias_x': round(rng.random(), 3), 'significance_y': round(rng.random(), 2)} for _ in range(size)]
+        for _ in range(num_topics)
+    ]
+
+
+def main():
+    for num_topics, size in ((1, 56), (1, 136), (1000, 40), (1000, 136), (100, 1000)):
+        topics = make_topics(num_topics, size)
+        expected = [python_selection(ps) for ps in topics]
+        batch = stratified_selection_batch(topics)
+        assert all((l, c, r) == e for (l, r, c), e in zip(batch, expected)), "selection mismatch"
+
+        flat = [p for ps in topics for p in ps]
+        bias = np.array([p['bias_x'] for p in flat])
+        significance = np.array([p['significance_y'] for p in flat])
+        sizes = [size] * num_topics
+
+        runs = 3 if num_topics > 1 else 2000
+        loop = timeit.timeit(lambda: [python_selection(ps) for ps in topics], number=runs) / runs
+        dicts = timeit.timeit(lambda: stratified_selection_batch(topics), number=runs) / runs
+        arrays = timeit.timeit(lambda: stratified_selection_indices(bias, significance, sizes), number=runs) / runs
+        print(
+            f"topics={num_topics:<5} size={size:<5} per-topic loop {loop * 1e3:8.3f} ms   "
+            f"batch (dicts) {dicts * 1e3:8.3f} ms   batch (arrays) {arrays * 1e3:8.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,6 @@ Module for api_request pipeline execution when imported by orchestrator.
 
 import os
 import sys
-import subprocess
 import threading
 import time
 import json
@@ -12,12 +11,31 @@ import asyncio
 from contextlib import asynccontextmanager
 from typing import Callable, Dict, List, Any, Optional
 from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
-import requests
 import argparse
 
 # Add main_modules to path to import api_request
 sys.path.append(os.path.join(os.path.dirname(__file__), 'main_modules'))
-from main_modules import api_request
+from modules.run_workspace import create_run_workspace, cleanup_runs
+from modules.json_utils import wait_for_pending_writes
+from modules.import_timing import lazy_import
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+# Kept apart from runs/, whose cleanup belongs to the orchestrator and its in-flight jobs
+RUNS_DIR = os.path.join(BACKEND_DIR, "runs-main")
+
+# The pipeline (google-genai), the clustering script (numpy) and the chart
+# renderer are imported on first use, so the server starts without them
+def load_pipeline():
+    return lazy_import("main_modules.api_request")
+
+def load_clustering():
+    return lazy_import("modules.clustering")
+
+def load_chart_render():
+    return lazy_import("modules.chart_render")
+
+# Working directory of the most recent run started by this process
+current_workspace = None
 
 # Event to signal server shutdown
 server_shutdown_event = threading.Event()
@@ -29,6 +47,8 @@ async def lifespan(app: FastAPI):
         print("Monitoring server shutdown...")
         server_shutdown_event.wait()
         print("Server shutdown signal received. Shutting down...")
+        # os._exit skips daemon threads, so let queued chart images finish first
+        load_chart_render().wait_for_pending_renders(timeout=120)
         os._exit(0)
     
     threading.Thread(target=monitor_shutdown, daemon=True).start()
@@ -55,25 +75,46 @@ async def run_pipeline_with_streaming(
     args.stream_callback = stream_callback
     
     try:
-        code = api_request.run_pipeline(args)
-        return code
+        final_obj = load_pipeline().run_pipeline(args)
+        return 0 if final_obj is not None else 1
     except Exception as e:
         print(f"Error in pipeline execution: {str(e)}")
         raise
 
-def run_clustering():
+def new_workspace():
+    """Create a run-scoped working directory seeded with input.json."""
+    global current_workspace
+    cleanup_runs(runs_dir=RUNS_DIR, keep=[current_workspace.run_id] if current_workspace else [])
+    current_workspace = create_run_workspace(
+        input_source=os.path.join(BACKEND_DIR, "input.json"), runs_dir=RUNS_DIR
+    )
+    return current_workspace
+
+def run_clustering(workspace=None):
     """Run the clustering process after perspectives are generated."""
-    clustering_file = os.path.join(os.path.dirname(__file__), "modules", "TOP-N_K_MEANS-CLUSTERING.py")
+    workspace = workspace or current_workspace
+    if workspace is None:
+        print("Error running clustering: no run workspace")
+        return False
     
     try:
-        subprocess.run([
-            sys.executable,
-            clustering_file
-        ], cwd=os.path.dirname(__file__), check=True)
+        with open(workspace.output_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        topic = data.get("input")
+        clustering = load_clustering()
+        selection = clustering.run_clustering(data.get("perspectives"), output_dir=workspace.final_output_dir,
+                                              topic=topic)
+        groups = (selection["leftist"], selection["rightist"], selection["common"])
+        spec = clustering.visualization_spec(*groups, topic)
+        clustering.save_chart_spec(spec, output_dir=workspace.final_output_dir)
+        # The PNG is drawn off the critical path (and reused for identical data);
+        # chart_spec.json is already there for the frontend
+        load_chart_render().render_in_background(
+            "debate_visualization", spec,
+            lambda path: clustering.create_visualization(*groups, topic, output_path=path),
+            os.path.join(workspace.final_output_dir, "debate_visualization.png")
+        )
         return True
-    except subprocess.CalledProcessError as e:
-        print(f"Clustering failed with exit code: {e.returncode}")
-        return False
     except Exception as e:
         print(f"Error running clustering: {str(e)}")
         return False
@@ -133,8 +174,7 @@ from fastapi.responses import JSONResponse
 # Trigger pipeline and stream perspectives to WebSocket
 @app.post("/api/run_pipeline_stream")
 async def run_pipeline_stream():
-    import importlib
-    from main_modules import api_request
+    api_request = load_pipeline()
     global active_ws
 
     def stream_callback(color, perspectives):
@@ -171,36 +211,40 @@ async def run_pipeline_stream():
         else:
             print(f"Cannot stream {color} perspectives: No active WebSocket connection")
 
+    workspace = new_workspace()
+
     class Args:
         pass
     args = Args()
-    args.input = "input.json"
-    args.output = "output.json"
+    args.input = workspace.input_path
+    args.output = workspace.output_path
     args.endpoint = None
     args.model = None
     args.temperature = 0.6
     args.stream_callback = stream_callback
 
     try:
-        code = api_request.run_pipeline(args)
-        return JSONResponse({"status": "completed", "code": code})
+        final_obj = api_request.run_pipeline(args)
+        return JSONResponse({"status": "completed", "code": 0 if final_obj is not None else 1})
     except Exception as e:
         return JSONResponse({"status": "error", "error": str(e)}, status_code=500)
 
 @app.post("/api/pipeline_complete")
 async def pipeline_complete(request: Request):
     """Endpoint to handle pipeline completion and start clustering."""
-    def run_clustering():
-        subprocess.run([
-            sys.executable,
-            os.path.join(os.path.dirname(__file__), "modules", "TOP-N_K_MEANS-CLUSTERING.py")
-        ])
+    workspace = current_workspace
+    if workspace is None:
+        return JSONResponse({"error": "no pipeline run in progress"}, status_code=409)
+
+    def run_clustering_and_notify():
+        run_clustering(workspace)
         # Notify server after clustering completes
+        import requests  # only needed to notify the server
         try:
             requests.post("http://127.0.0.1:8000/api/clustering_complete", json={"status": "clustering_done"})
         except Exception as e:
             print(f"Failed to notify clustering completion: {e}")
-    threading.Thread(target=run_clustering).start()
+    threading.Thread(target=run_clustering_and_notify).start()
     return {"status": "Clustering started"}
 
 @app.post("/api/clustering_complete")
@@ -210,9 +254,11 @@ async def clustering_complete(request: Request):
     return {"status": "server will end"}
 @app.get("/api/status")
 async def check_status():
-    # Check if processing is complete by looking for output file
-    output_exists = os.path.exists("output.json")
-    clustering_exists = os.path.exists("final_output/common.json")
+    # Check if processing is complete by looking for the current run's output files
+    if current_workspace is None:
+        return {"status": "processing", "progress": 10}
+    output_exists = os.path.exists(current_workspace.output_path)
+    clustering_exists = os.path.exists(os.path.join(current_workspace.final_output_dir, "common.json"))
     
     if clustering_exists:
         return {"status": "completed"}
@@ -245,16 +291,20 @@ if __name__ == "__main__":
 
     # Invoke api_request.py outside lifespan
     # Note: No need to read config.json here, api_request will read it directly
+    workspace = new_workspace()
     args = argparse.Namespace(
-        input="input.json",
-        output="output.json", 
+        input=workspace.input_path,
+        output=workspace.output_path, 
         endpoint=None,
         model=None,
         temperature=0.6
     )
-    api_request.run_pipeline(args)
+    load_pipeline().run_pipeline(args)
+    # Clustering reads output.json once notified
+    wait_for_pending_writes()
 
     # Notify server after pipeline completes
+    import requests  # only needed to notify the server
     try:
         requests.post("http://127.0.0.1:8000/api/pipeline_complete", json={"status": "done"})
     except Exception as e:
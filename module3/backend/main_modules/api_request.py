@@ -23,8 +23,9 @@ Rules:
 import argparse
 import os
 import sys
-from typing import List, Dict, Any, Set
-import requests
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Dict, Any, Optional, Set, Tuple
 import json
 
 try:
@@ -34,30 +35,305 @@ except Exception:
     pass  # optional dependency
 
 # Import our modular components
-from modules.vertex_client import build_client, call_model
-from modules.json_utils import load_input, write_output, parse_model_output
+from modules.vertex_client import build_client, call_model, get_response_cache, load_config as load_cached_config
+from modules.dedup_index import NearDuplicateIndex
+from modules.response_cache import CacheTally, use_cache_tally
+from modules.metrics import METRICS
+from modules.tracing import Tracer, span, submit_in_context, use_tracer
+from modules.json_utils import (
+    load_input, write_output_async, wait_for_pending_writes, parse_model_output, StreamingObjectParser
+)
 from modules.prompt_builder import build_color_prompt, build_repair_prompt
 from modules.perspective_utils import (
     build_scaffold, 
     group_by_color, 
     validate_and_categorize_perspectives,
-    process_repair_results
+    process_repair_results,
+    create_fallback_perspective
 )
 
 VERTEX_ENDPOINT_ENV = "VERTEX_ENDPOINT"
 
 
 def load_config():
-    """Load configuration from config.json."""
-    config_path = os.path.join(os.path.dirname(__file__), "..", "config.json")
-    with open(config_path, "r") as config_file:
-        return json.load(config_file)
+    """Load configuration from config.json (cached, reloaded when the file changes)."""
+    return load_cached_config()
+
+
+def build_duplicate_index(args) -> NearDuplicateIndex:
+    """Build the near-duplicate index from config.json, honoring --dup-threshold."""
+    settings = load_config().get("dedup", {})
+    threshold = getattr(args, "dup_threshold", None)
+    return NearDuplicateIndex(
+        threshold=threshold if threshold is not None else settings.get("similarity_threshold", 0.9),
+        num_perm=settings.get("num_perm", 64),
+        bands=settings.get("bands", 16),
+        shingle_size=settings.get("shingle_size", 4),
+    )
+
+
+def _request_repair(client, endpoint, repair_prompt, use_cache: bool, color: str) -> List[Dict[str, Any]]:
+    with span("repair_batch", color=color):
+        repair_raw = call_model(client, endpoint, repair_prompt, temperature=0.3, use_cache=use_cache, color=color)
+        try:
+            with span("parse_model_output", color=color):
+                return parse_model_output(repair_raw)
+        except Exception:
+            METRICS.inc("parse_failures_total", color=color, stage="repair")
+            raise
+
+
+def repair_perspectives(
+    client,
+    endpoint: str,
+    statement: str,
+    needs_repair: List[Tuple[int, Dict[str, Any], Dict[str, Any]]],
+    existing_texts: Set[str],
+    use_cache: bool = True,
+    repair_concurrency: int = 1
+) -> List[Dict[str, Any]]:
+    """
+    Repair (index, slot, generated) items in batches of 3, falling back per batch.
+
+    Batches are sent concurrently (at most ``repair_concurrency`` at a time).
+    Results are applied in bias_x order once all batches have returned, so the
+    outcome does not depend on which request finishes first.
+
+    Args:
+        client: Initialized Vertex AI client
+        endpoint: Vertex endpoint path
+        statement: The main topic/statement
+        needs_repair: Items needing repair as (index, slot, generated) tuples
+        existing_texts: Texts to avoid; updated in place with accepted texts
+        use_cache: Set to False to bypass the response cache
+        repair_concurrency: Maximum number of repair batches in flight
+
+    Returns:
+        Repaired or fallback perspectives sorted by bias_x
+    """
+    started = time.perf_counter()
+    ordered = sorted(needs_repair, key=lambda item: item[1]["bias_x"])
+    for _, slot, _ in ordered:
+        METRICS.inc("repair_items_total", color=slot["color"])
+    repair_batches = [ordered[i:i+3] for i in range(0, len(ordered), 3)]
+
+    repair_prompts = []
+    for batch in repair_batches:
+        repair_items = []
+        for _, slot, gen in batch:
+            repair_items.append({
+                "color": slot["color"],
+                "bias_x": slot["bias_x"],
+                "current_text": gen.get("text", ""),
+                "current_significance": gen.get("significance_y", "")
+            })
+        repair_prompts.append(build_repair_prompt(statement, repair_items, existing_texts))
+
+    workers = max(1, min(repair_concurrency, len(repair_batches)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            submit_in_context(pool, _request_repair, client, endpoint, prompt, use_cache, batch[0][1]["color"])
+            for batch, prompt in zip(repair_batches, repair_prompts)
+        ]
+
+        repaired_perspectives: List[Dict[str, Any]] = []
+        for batch, future in zip(repair_batches, futures):
+            try:
+                repair_results = future.result()
+
+                # Process repair results
+                repaired_perspectives.extend(process_repair_results(batch, repair_results, existing_texts))
+
+            except Exception as e:
+                print(f"[warn] Repair failed, using fallbacks")
+                # Use fallbacks for all items in this batch
+                for orig_i, slot, gen in batch:
+                    fallback = create_fallback_perspective(slot, existing_texts)
+                    existing_texts.add(fallback["text"])
+                    repaired_perspectives.append(fallback)
+
+    METRICS.observe("pipeline_stage_seconds", time.perf_counter() - started, stage="repair")
+    return repaired_perspectives
+
+
+def generate_color_group(
+    client,
+    endpoint: str,
+    statement: str,
+    group: List[Dict[str, Any]],
+    existing_texts: Set[str],
+    temperature: float,
+    use_cache: bool = True,
+    perspective_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    repair_concurrency: int = 1
+) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Generate, validate and repair the perspectives of a single color group.
+
+    Args:
+        client: Initialized Vertex AI client
+        endpoint: Vertex endpoint path
+        statement: The main topic/statement
+        group: Scaffold slots of one color
+        existing_texts: Texts to avoid; updated in place with accepted texts
+        temperature: Sampling temperature for the main generation call
+        use_cache: Set to False to bypass the response cache
+        perspective_callback: Called as (color, perspective) for every valid
+            perspective while the group is still streaming. Repaired items only
+            appear in the final group result.
+        repair_concurrency: Maximum number of repair batches in flight
+
+    Returns:
+        Tuple of (color_name, perspectives sorted by bias_x)
+    """
+    color_name = group[0]['color']
+    with span("generate_color_group", color=color_name, slots=len(group)):
+        print(f"[info] Processing {color_name} perspectives ({len(group)} items)")
+
+        # Validate each perspective as soon as its object is complete in the stream
+        parser = StreamingObjectParser()
+        valid_perspectives: List[Dict[str, Any]] = []
+        needs_repair: List[Tuple[int, Dict[str, Any], Dict[str, Any]]] = []
+        # Slots validated from the stream; objects after a non-perspective one
+        # (e.g. a {"perspectives": [...]} wrapper) are left to whole-response parsing
+        received = 0
+        stream_usable = True
+
+        def on_chunk(chunk: str) -> None:
+            nonlocal received, stream_usable
+            for obj in parser.feed(chunk):
+                if not stream_usable:
+                    continue
+                if not isinstance(obj, dict) or not ("text" in obj or "bias_x" in obj):
+                    stream_usable = False
+                    continue
+                i = received
+                if i >= len(group):
+                    continue
+                received += 1
+                with span("validate", color=color_name, index=i):
+                    valid, repair = validate_and_categorize_perspectives([group[i]], [obj], existing_texts)
+                needs_repair.extend((i, slot, gen) for _, slot, gen in repair)
+                for perspective in valid:
+                    valid_perspectives.append(perspective)
+                    if perspective_callback:
+                        try:
+                            perspective_callback(color_name, perspective)
+                        except Exception as e:
+                            print(f"[warn] Perspective callback failed for {color_name}: {e}")
+
+        # Generate main batch for this color
+        with span("build_color_prompt", color=color_name):
+            prompt_text = build_color_prompt(statement, group, existing_texts)
+        raw = call_model(
+            client, endpoint, prompt_text, temperature=temperature, use_cache=use_cache, on_chunk=on_chunk,
+            color=color_name
+        )
+
+        # Wrapped, unstreamed or short output: parse the whole response for the
+        # slots the stream did not fill
+        if received < len(group):
+            try:
+                with span("parse_model_output", color=color_name):
+                    generated = parse_model_output(raw)
+            except Exception as e:
+                if received:
+                    generated = []
+                else:
+                    print(f"[warn] {color_name} parse failed, retrying with lower temperature")
+                    METRICS.inc("parse_failures_total", color=color_name, stage="generation")
+                    METRICS.inc("model_call_retries_total", color=color_name, reason="parse")
+                    raw_retry = call_model(
+                        client, endpoint, prompt_text, temperature=0.2, use_cache=use_cache, color=color_name
+                    )
+                    with span("parse_model_output", color=color_name, retry=True):
+                        generated = parse_model_output(raw_retry)
+
+            # Validate and categorize results
+            rest = group[received:]
+            with span("validate", color=color_name):
+                valid, repair = validate_and_categorize_perspectives(rest, generated[received:], existing_texts)
+            valid_perspectives.extend(valid)
+            needs_repair.extend((received + i, slot, gen) for i, slot, gen in repair)
+            # Slots the response never reached go through repair as well
+            answered = received + len(generated[received:])
+            needs_repair.extend((i, group[i], {}) for i in range(answered, len(group)))
+
+        # Batch repair if needed (max 3 items to avoid overwhelming)
+        if needs_repair:
+            print(f"[info] Repairing {len(needs_repair)} items for {color_name}")
+            with span("repair", color=color_name, items=len(needs_repair)):
+                valid_perspectives.extend(
+                    repair_perspectives(
+                        client, endpoint, statement, needs_repair, existing_texts, use_cache, repair_concurrency
+                    )
+                )
+
+        # Sort results by bias_x to maintain order
+        valid_perspectives.sort(key=lambda x: x["bias_x"])
+        return color_name, valid_perspectives
+
+
+def reconcile_color_group(
+    client,
+    endpoint: str,
+    statement: str,
+    perspectives: List[Dict[str, Any]],
+    existing_texts: Set[str],
+    use_cache: bool = True,
+    repair_concurrency: int = 1
+) -> List[Dict[str, Any]]:
+    """
+    Merge a concurrently generated color group into the shared duplicate set.
+
+    Perspectives whose text was already accepted for another color are sent
+    through the regular repair path; everything else is added to existing_texts.
+
+    Args:
+        client: Initialized Vertex AI client
+        endpoint: Vertex endpoint path
+        statement: The main topic/statement
+        perspectives: Validated perspectives of one color group
+        existing_texts: Shared set of accepted texts, updated in place
+        use_cache: Set to False to bypass the response cache
+        repair_concurrency: Maximum number of repair batches in flight
+
+    Returns:
+        Reconciled perspectives sorted by bias_x
+    """
+    kept: List[Dict[str, Any]] = []
+    duplicates: List[Tuple[int, Dict[str, Any], Dict[str, Any]]] = []
+    for i, p in enumerate(perspectives):
+        if p["text"] in existing_texts:
+            duplicates.append((i, {"color": p["color"], "bias_x": p["bias_x"]}, p))
+        else:
+            existing_texts.add(p["text"])
+            kept.append(p)
+
+    if duplicates:
+        print(f"[info] Repairing {len(duplicates)} cross-color duplicates for {perspectives[0]['color']}")
+        with span("repair", color=perspectives[0]["color"], items=len(duplicates), reconcile=True):
+            kept.extend(repair_perspectives(
+                client, endpoint, statement, duplicates, existing_texts, use_cache, repair_concurrency
+            ))
+
+    kept.sort(key=lambda x: x["bias_x"])
+    return kept
 
 
 def run_pipeline(args):
-    """Main pipeline for generating structured perspectives."""
+    """
+    Main pipeline for generating structured perspectives.
+    
+    Returns:
+        The result object ({"input": ..., "perspectives": [...]}), or None if
+        the model client could not be created. When args.output is set the
+        result is also written there on a background thread. Response cache
+        lookups are counted on args.cache_tally when given.
+    """
     # Load and validate input
-    statement, significance = load_input(args.input)
+    with span("load_input"):
+        statement, significance = load_input(args.input)
     
     # Calculate perspective count based on the formula: 128 · (s^2.8) + 8{s≥0}{s≤1}
     # The indicator functions {s≥0} and {s≤1} both equal 1 since we clamp significance to [0,1]
@@ -65,7 +341,8 @@ def run_pipeline(args):
     perspective_count = int(math.ceil(128 * (significance ** 2.8) + 8))
     print(f"[info] Significance score: {significance}, calculated perspective count: {perspective_count}")
     
-    scaffold = build_scaffold(perspective_count)
+    with span("build_scaffold", count=perspective_count):
+        scaffold = build_scaffold(perspective_count)
             
     # Get endpoint and build client
     endpoint = args.endpoint or os.environ.get(VERTEX_ENDPOINT_ENV) or args.model
@@ -76,88 +353,79 @@ def run_pipeline(args):
         client = build_client(endpoint)
     except Exception as e:
         print("[error] Client init failed:", e, file=sys.stderr)
-        return 1
+        return None
     
     # Process perspectives by color groups
-    existing_texts: Set[str] = set()
+    existing_texts = build_duplicate_index(args)
     all_persp: List[Dict[str, Any]] = []
     color_groups = group_by_color(scaffold)
     
     # Optionally stream each color group via callback
     stream_callback = getattr(args, "stream_callback", None)
+    perspective_callback = getattr(args, "perspective_callback", None)
+    concurrency = max(1, int(getattr(args, "concurrency", 1) or 1))
+    repair_concurrency = max(1, int(getattr(args, "repair_concurrency", 1) or 1))
+    use_cache = getattr(args, "use_cache", True)
+    response_cache = get_response_cache() if use_cache else None
 
-    for ci, group in enumerate(color_groups):
-        color_name = group[0]['color']
-        print(f"[info] Processing {color_name} perspectives ({len(group)} items)")
-
-        # Generate main batch for this color
-        prompt_text = build_color_prompt(statement, group, existing_texts)
-        raw = call_model(client, endpoint, prompt_text, temperature=args.temperature)
-
-        try:
-            generated = parse_model_output(raw)
-        except Exception as e:
-            print(f"[warn] {color_name} parse failed, retrying with lower temperature")
-            raw_retry = call_model(client, endpoint, prompt_text, temperature=0.2)
-            generated = parse_model_output(raw_retry)
-
-        # Validate and categorize results
-        valid_perspectives, needs_repair = validate_and_categorize_perspectives(
-            group, generated, existing_texts
-        )
-
-        # Batch repair if needed (max 3 items to avoid overwhelming)
-        if needs_repair:
-            print(f"[info] Repairing {len(needs_repair)} items for {color_name}")
-            repair_batches = [needs_repair[i:i+3] for i in range(0, len(needs_repair), 3)]
-
-            for batch in repair_batches:
-                repair_items = []
-                for _, slot, gen in batch:
-                    repair_items.append({
-                        "color": slot["color"],
-                        "bias_x": slot["bias_x"],
-                        "current_text": gen.get("text", ""),
-                        "current_significance": gen.get("significance_y", "")
-                    })
-
-                repair_prompt = build_repair_prompt(statement, repair_items, existing_texts)
-
-                try:
-                    repair_raw = call_model(client, endpoint, repair_prompt, temperature=0.3, delay_after=1.5)
-                    repair_results = parse_model_output(repair_raw)
-
-                    # Process repair results
-                    repaired = process_repair_results(batch, repair_results, existing_texts)
-                    valid_perspectives.extend(repaired)
-
-                except Exception as e:
-                    print(f"[warn] Repair failed, using fallbacks")
-                    # Use fallbacks for all items in this batch
-                    fallback_perspectives = []
-                    for orig_i, slot, gen in batch:
-                        from modules.perspective_utils import create_fallback_perspective
-                        fallback = create_fallback_perspective(slot)
-                        existing_texts.add(fallback["text"])
-                        fallback_perspectives.append(fallback)
-                    valid_perspectives.extend(fallback_perspectives)
+    generation_started = time.perf_counter()
 
-        # Sort results by bias_x to maintain order
-        valid_perspectives.sort(key=lambda x: x["bias_x"])
+    def emit(color_name, valid_perspectives):
         all_persp.extend(valid_perspectives)
 
         # Stream this color group if callback is provided
         if stream_callback:
             try:
-                stream_callback(color_name, valid_perspectives)
+                with span("stream_callback", color=color_name, count=len(valid_perspectives)):
+                    stream_callback(color_name, valid_perspectives)
             except Exception as e:
                 print(f"[warn] Streaming callback failed for {color_name}: {e}")
+
+    # Lookups of this run only; other runs share the cache and its counters
+    cache_tally = getattr(args, "cache_tally", None) or CacheTally()
+    with use_cache_tally(cache_tally):
+        if concurrency == 1:
+            for group in color_groups:
+                color_name, valid_perspectives = generate_color_group(
+                    client, endpoint, statement, group, existing_texts, args.temperature, use_cache,
+                    perspective_callback, repair_concurrency
+                )
+                emit(color_name, valid_perspectives)
+        else:
+            # Every group starts from the same snapshot of existing_texts, so
+            # collisions between colors are only visible once a group returns.
+            print(f"[info] Generating {len(color_groups)} color groups with concurrency {concurrency}")
+            with ThreadPoolExecutor(max_workers=min(concurrency, len(color_groups))) as pool:
+                futures = [
+                    submit_in_context(
+                        pool, generate_color_group,
+                        client, endpoint, statement, group, existing_texts.copy(), args.temperature, use_cache,
+                        perspective_callback, repair_concurrency
+                    )
+                    for group in color_groups
+                ]
+                for future in as_completed(futures):
+                    color_name, valid_perspectives = future.result()
+                    with span("reconcile", color=color_name):
+                        valid_perspectives = reconcile_color_group(
+                            client, endpoint, statement, valid_perspectives, existing_texts, use_cache,
+                            repair_concurrency
+                        )
+                    emit(color_name, valid_perspectives)
     
+    METRICS.observe("pipeline_stage_seconds", time.perf_counter() - generation_started, stage="generation")
+
+    if response_cache:
+        tally = cache_tally.stats()
+        lookups = tally["hits"] + tally["misses"]
+        print(f"[info] Response cache: {tally['hits']}/{lookups} hits ({tally['hit_rate']:.0%}) this run")
+
     # Final sort and output
     all_persp.sort(key=lambda x: x["bias_x"])
     final_obj = {"input": statement, "perspectives": all_persp[:len(scaffold)]}
-    write_output(args.output, final_obj)
-    return 0
+    if getattr(args, "output", None):
+        write_output_async(args.output, final_obj)
+    return final_obj
 
 
 def build_arg_parser():
@@ -170,6 +438,15 @@ def build_arg_parser():
     p.add_argument("--model", help="(Deprecated) Use --endpoint instead.")
     # Note: --count is removed as perspective count is now only read from config.json
     p.add_argument("--temperature", type=float, default=0.6, help="Sampling temperature")
+    p.add_argument("--dup-threshold", type=float, default=None,
+                   help="Similarity (0-1) at which texts count as near-duplicates (overrides config.json)")
+    p.add_argument("--no-cache", dest="use_cache", action="store_false",
+                   help="Bypass the on-disk model response cache")
+    p.add_argument("--concurrency", type=int, default=1,
+                   help="Number of color groups generated in parallel (1 = sequential)")
+    p.add_argument("--repair-concurrency", type=int, default=4,
+                   help="Maximum number of repair batches sent in parallel per color")
+    p.add_argument("--trace", help="Write a Chrome trace-event JSON of the run to this path")
     return p
 
 
@@ -177,9 +454,20 @@ def main():
     """Main entry point."""
     parser = build_arg_parser()
     args = parser.parse_args()
-    code = run_pipeline(args)
+    tracer = Tracer("api_request") if args.trace else None
+    with use_tracer(tracer), span("run_pipeline"):
+        final_obj = run_pipeline(args)
+    if tracer:
+        with open(args.trace, "w", encoding="utf-8") as f:
+            json.dump(tracer.to_chrome(), f)
+        print(f"[info] Trace written → {args.trace}")
+    code = 0 if final_obj is not None else 1
+
+    # The server reads output.json once notified, so the write must be done
+    wait_for_pending_writes()
 
     # Notify server after pipeline completes
+    import requests  # only needed to notify the server
     try:
         requests.post("http://127.0.0.1:8000/api/pipeline_complete", json={"status": "done"})
     except Exception as e:
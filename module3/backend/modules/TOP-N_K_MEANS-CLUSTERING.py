@@ -1,8 +1,15 @@
+import contextlib
+import glob
+import io
 import json
+import re
+import time
 import numpy as np
 import sys
 import os
-import matplotlib.pyplot as plt
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from operator import itemgetter
 
 # --- DATA LOADING AND VISUALIZATION FUNCTIONS (No changes here) ---
 
@@ -38,6 +45,126 @@ def determine_target_size(num_perspectives: int) -> int:
     # Ensure we don't try to select more than we have
     return min(k, num_perspectives)
 
+LEFTIST_THRESHOLD, RIGHTIST_THRESHOLD = 0.428, 0.571
+LEFTIST, COMMON, RIGHTIST = 0, 1, 2
+# np.digitize bins: bias < 0.428 -> 0, 0.428 <= bias <= 0.571 -> 1, bias > 0.571 -> 2.
+# The upper edge is the next float above 0.571 so that exactly 0.571 stays common.
+_BIAS_BINS = np.array([LEFTIST_THRESHOLD, np.nextafter(RIGHTIST_THRESHOLD, np.inf)])
+
+def _allocate_slots(counts, targets):
+    """
+    Splits each topic's target size over its (leftist, common, rightist) counts.
+    Proportional shares are rounded half-to-even like round(), then the total is
+    corrected one slot at a time: too many takes from the largest group, too few
+    adds to the smallest (ties resolved leftist, rightist, common).
+    """
+    totals = counts.sum(axis=1)
+    shares = counts / np.where(totals > 0, totals, 1)[:, None]
+    slots = np.rint(shares * targets[:, None]).astype(int)
+    for t in np.flatnonzero(slots.sum(axis=1) != targets):
+        num_leftist, num_common, num_rightist = (int(v) for v in slots[t])
+        target_k = int(targets[t])
+        while (num_leftist + num_rightist + num_common) != target_k:
+            if (num_leftist + num_rightist + num_common) > target_k:
+                if num_leftist > num_rightist and num_leftist > num_common: num_leftist -= 1
+                elif num_rightist > num_common: num_rightist -= 1
+                else: num_common -= 1
+            else:
+                if num_leftist < num_rightist and num_leftist < num_common: num_leftist += 1
+                elif num_rightist < num_common: num_rightist += 1
+                else: num_common += 1
+        slots[t] = (num_leftist, num_common, num_rightist)
+    return slots
+
+def _group_order(groups, significance):
+    """
+    Positions ordered by (group, significance descending, position), computed as
+    one argsort over a unique int64 key built from the dense significance rank.
+    Falls back to lexsort when the key would not fit in 63 bits.
+    """
+    n = len(groups)
+    positions = np.arange(n, dtype=np.int64)
+    if n == 0 or (int(groups.max()) + 1) * (n + 1) * n >= 2 ** 62:
+        return np.lexsort((positions, -significance, groups))
+    _, rank = np.unique(-significance, return_inverse=True)
+    key = (groups.astype(np.int64) * (n + 1) + rank.reshape(-1)) * n + positions
+    return np.argsort(key)
+
+def stratified_selection_indices(bias, significance, sizes):
+    """
+    Array core of the stratified selection for a batch of topics.
+
+    bias and significance hold all topics' perspectives back to back, sizes the
+    number per topic (significance is only read for topics that get reduced).
+    Returns (selected, counts, slots, targets): selected are flat indices ordered
+    by topic, then leftist/common/rightist pool, then significance descending
+    (input order for topics that need no reduction); counts and slots are
+    (topics, 3) arrays of pool sizes before and after selection.
+    """
+    bias = np.asarray(bias, dtype=np.float64)
+    significance = np.asarray(significance, dtype=np.float64)
+    sizes = np.asarray(sizes, dtype=np.intp)
+    num_topics = len(sizes)
+    buckets = np.digitize(bias, _BIAS_BINS)
+    buckets[np.isnan(bias)] = COMMON  # NaN compares false to both thresholds
+    topic_ids = np.repeat(np.arange(num_topics), sizes)
+    groups = topic_ids * 3 + buckets
+    counts = np.bincount(groups, minlength=3 * num_topics).reshape(-1, 3)
+    targets = np.array([determine_target_size(int(n)) for n in sizes], dtype=np.intp)
+    reduce = targets != sizes
+    slots = counts.copy()
+    if reduce.any():
+        slots[reduce] = _allocate_slots(counts[reduce], targets[reduce])
+
+    # Pools of unreduced topics keep input order: rank them all as equal
+    order = _group_order(groups, np.where(reduce[topic_ids], significance, 0.0))
+    group_start = np.concatenate(([0], np.cumsum(counts.ravel())[:-1]))
+    sorted_groups = groups[order]
+    rank = np.arange(len(order)) - group_start[sorted_groups]
+    selected = order[rank < slots.ravel()[sorted_groups]]
+    return selected, counts, slots, targets
+
+def stratified_selection_batch(topics: list, verbose: bool = False):
+    """
+    Runs the stratified selection for many topics' perspective lists in one call
+    (see stratified_selection_indices). Returns one (leftist, rightist, common)
+    tuple per topic, identical to calling stratified_selection_and_distribution
+    on each topic. A single topic is faster through that function: converting
+    the dicts to arrays only pays off across many topics.
+    """
+    sizes = [len(perspectives) for perspectives in topics]
+    flat = [p for perspectives in topics for p in perspectives]
+    targets = [determine_target_size(n) for n in sizes]
+    reduced = [t != n for t, n in zip(targets, sizes)]
+    try:
+        bias = np.fromiter(map(itemgetter('bias_x'), flat), dtype=np.float64, count=len(flat))
+    except KeyError:
+        bias = np.array([p.get('bias_x', 0.5) for p in flat], dtype=np.float64)
+    try:
+        significance = np.fromiter(map(itemgetter('significance_y'), flat), dtype=np.float64, count=len(flat))
+    except KeyError:
+        # Only topics that get reduced need a significance score
+        significance = np.array(
+            [p['significance_y'] if r else 0.0 for perspectives, r in zip(topics, reduced) for p in perspectives],
+            dtype=np.float64
+        )
+    selected, counts, slots, targets = stratified_selection_indices(bias, significance, sizes)
+
+    chosen = [flat[i] for i in selected.tolist()]
+    bounds = np.concatenate(([0], np.cumsum(np.minimum(slots, counts).ravel()))).tolist()
+    results = []
+    for t in range(len(topics)):
+        left, common, right = (chosen[bounds[3 * t + b]:bounds[3 * t + b + 1]] for b in (LEFTIST, COMMON, RIGHTIST))
+        if verbose:
+            print(f"Initial distribution: {counts[t, LEFTIST]} Leftist, {counts[t, COMMON]} Common, {counts[t, RIGHTIST]} Rightist.")
+            print(f"Based on {sizes[t]} inputs, the target size is {targets[t]}.")
+            if reduced[t]:
+                print(f"Calculated fair distribution: {slots[t, LEFTIST]} Leftist, {slots[t, COMMON]} Common, {slots[t, RIGHTIST]} Rightist.")
+            else:
+                print("Number of perspectives is within the target range. No reduction needed.")
+        results.append((left, right, common))
+    return results
+
 def stratified_selection_and_distribution(perspectives: list):
     """
     Performs the entire reduction and distribution process:
@@ -45,9 +172,9 @@ def stratified_selection_and_distribution(perspectives: list):
     2. Categorizes all perspectives by bias.
     3. Calculates a proportional number of slots for each category.
     4. Selects the most significant perspectives from each category to fill the slots.
+    Many topics at once go through stratified_selection_batch instead.
     """
     leftist_pool, rightist_pool, common_pool = [], [], []
-    LEFTIST_THRESHOLD, RIGHTIST_THRESHOLD = 0.428, 0.571
 
     # 1. Categorize all perspectives
     for p in perspectives:
@@ -102,6 +229,320 @@ def stratified_selection_and_distribution(perspectives: list):
     
     return final_leftist, final_rightist, final_common
 
+# --- K-MEANS CLUSTERING ---
+
+# Every character that is not part of a word (\w) or the text separator becomes
+# a NUL byte before hashing; ASCII input takes the translate table, the rest the regex
+_NON_WORD_CHAR = re.compile(r"[^\w\n]", re.UNICODE)
+_ASCII_WORD_BYTES = str.maketrans({chr(c): chr(c) if chr(c).isalnum() or c == 95 else "\0" for c in range(128)})
+# Polynomial hash of a word's UTF-8 bytes modulo 2**64, spread over the columns by a Fibonacci multiplier
+_HASH_BASE = 1099511628211
+_HASH_MIX = np.uint64(0x9E3779B97F4A7C15)
+# The buffer is hashed in blocks of about this many bytes, cut at separators
+_HASH_BLOCK = 1 << 18
+
+def _power_table(base: int, size: int):
+    powers = np.full(size, base, dtype=np.uint64)
+    powers[0] = 1
+    np.multiply.accumulate(powers, out=powers)
+    return powers
+
+_HASH_POWERS = _power_table(_HASH_BASE, _HASH_BLOCK)
+_HASH_INVERSE_POWERS = _power_table(pow(_HASH_BASE, -1, 2 ** 64), _HASH_BLOCK)
+
+def _hash_words(data, starts, offset):
+    """Hashes of the words starting at starts (positions in data, a block of the buffer at offset)."""
+    if len(data) > len(_HASH_POWERS):
+        powers = _power_table(_HASH_BASE, len(data))
+        inverse = _power_table(pow(_HASH_BASE, -1, 2 ** 64), len(data))
+    else:
+        powers, inverse = _HASH_POWERS, _HASH_INVERSE_POWERS
+    # Separator bytes are 0, so each segment from a word start sums just that word
+    sums = np.add.reduceat(data * powers[:len(data)], starts - offset)
+    return sums * inverse[starts - offset]
+
+def _hashed_cells(texts: list, dims: int):
+    """
+    Flat (row * dims + column) cell index of every word occurrence in texts, in
+    text order. Words are the lowercased \\w+ runs; each is hashed into one of
+    dims columns by a polynomial hash of its bytes. The texts are joined into
+    one byte buffer with every other character zeroed, and a word's hash is the
+    sum of byte * base**position over its bytes, taken from one reduceat per
+    block and shifted back to the word's start with the inverse power, so no
+    Python code runs per word.
+    """
+    lowered = [(text or '').replace('\n', ' ').lower() for text in texts]
+    joined = '\n'.join(lowered)
+    if joined.isascii():
+        buffer = joined.translate(_ASCII_WORD_BYTES).encode('ascii')
+        lengths = np.fromiter(map(len, lowered), dtype=np.intp, count=len(lowered))
+    else:
+        cleaned = _NON_WORD_CHAR.sub('\0', joined)
+        lengths = np.fromiter((len(t.encode('utf-8')) for t in cleaned.split('\n')), dtype=np.intp, count=len(lowered))
+        buffer = cleaned.replace('\n', '\0').encode('utf-8')
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    in_word = data != 0
+    starts = np.flatnonzero(in_word[1:] > in_word[:-1]) + 1
+    if len(data) and in_word[0]:
+        starts = np.concatenate(([0], starts))
+    if not len(starts):
+        return np.zeros(0, dtype=np.intp)
+    hashes = np.empty(len(starts), dtype=np.uint64)
+    begin = 0
+    while begin < len(data):
+        end = len(data)
+        if end - begin > _HASH_BLOCK:
+            # Cut at a separator so no word spans two blocks
+            cut = buffer.rfind(b'\0', begin + 1, begin + _HASH_BLOCK)
+            end = cut if cut > begin else buffer.find(b'\0', begin + _HASH_BLOCK)
+            end = len(data) if end < 0 else end
+        first, last = np.searchsorted(starts, (begin, end))
+        if last > first:
+            hashes[first:last] = _hash_words(data[begin:end], starts[first:last], begin)
+        begin = end
+    columns = ((hashes * _HASH_MIX) >> np.uint64(32)) % np.uint64(dims)
+    rows = np.searchsorted(np.cumsum(lengths + 1), starts, side='right')
+    return rows * dims + columns.astype(np.intp)
+
+def hashed_term_counts(texts: list, dims: int):
+    """Builds the (n, dims) float matrix of hashed word counts per text (see _hashed_cells)."""
+    cells = _hashed_cells(texts, dims)
+    return np.bincount(cells, minlength=len(texts) * dims).reshape(len(texts), dims).astype(np.float64)
+
+def build_feature_matrix(perspectives: list, text_features: int = 0, text_weight: float = 0.5):
+    """
+    Builds the (n, 2 + text_features) float matrix of bias_x, significance_y and,
+    optionally, hashed bag-of-words text features (L2-normalized, scaled by text_weight).
+    """
+    n = len(perspectives)
+    X = np.empty((n, 2 + text_features), dtype=np.float64)
+    X[:, 0] = [p.get('bias_x', 0.5) for p in perspectives]
+    X[:, 1] = [p.get('significance_y', 0.0) for p in perspectives]
+    if text_features:
+        X[:, 2:] = hashed_term_counts([p.get('text', '') for p in perspectives], text_features)
+        norms = np.linalg.norm(X[:, 2:], axis=1, keepdims=True)
+        X[:, 2:] *= text_weight / np.where(norms > 0, norms, 1.0)
+    return X
+
+def _nearest_centroid(X, centroids):
+    """Index of the closest centroid per row; |x|^2 is constant per row, so argmin(|c|^2 - 2x.c) suffices."""
+    scores = X @ centroids.T
+    scores *= -2.0
+    scores += np.einsum('ij,ij->i', centroids, centroids)
+    return scores.argmin(axis=1)
+
+def kmeans_plus_plus(X, k: int, rng):
+    """Chooses k initial centroids by D^2 sampling (k-means++)."""
+    n = X.shape[0]
+    centroids = np.empty((k, X.shape[1]), dtype=X.dtype)
+    centroids[0] = X[rng.integers(n)]
+    closest = ((X - centroids[0]) ** 2).sum(axis=1)
+    for c in range(1, k):
+        total = closest.sum()
+        # All remaining points coincide with a centroid: any choice is as good
+        idx = rng.integers(n) if total <= 0 else rng.choice(n, p=closest / total)
+        centroids[c] = X[idx]
+        np.minimum(closest, ((X - centroids[c]) ** 2).sum(axis=1), out=closest)
+    return centroids
+
+def kmeans(X, k: int, seed: int = 0, max_iter: int = 100, tol: float = 1e-4):
+    """
+    Vectorized Lloyd's k-means with k-means++ initialization.
+
+    Stops when no label changes or the total centroid shift falls below
+    tol times the mean per-feature variance. Empty clusters are re-seeded
+    with the point farthest from its centroid.
+    Returns (centroids, labels, inertia, iterations).
+    """
+    X = np.asarray(X, dtype=np.float64)
+    n = X.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty((0, X.shape[1])), np.empty(0, dtype=np.intp), 0.0, 0
+    rng = np.random.default_rng(seed)
+    centroids = kmeans_plus_plus(X, k, rng)
+    threshold = tol * float(np.mean(np.var(X, axis=0)))
+    labels = None
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        new_labels = _nearest_centroid(X, centroids)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+        counts = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centroids)
+        for j in range(X.shape[1]):
+            sums[:, j] = np.bincount(labels, weights=X[:, j], minlength=k)
+        new_centroids = centroids.copy()
+        filled = counts > 0
+        new_centroids[filled] = sums[filled] / counts[filled, None]
+        if not filled.all():
+            own = ((X - centroids[labels]) ** 2).sum(axis=1)
+            for c in np.flatnonzero(~filled):
+                far = own.argmax()
+                new_centroids[c] = X[far]
+                labels[far] = c
+                own[far] = 0.0
+
+        shift = float(((new_centroids - centroids) ** 2).sum())
+        centroids = new_centroids
+        if shift <= threshold:
+            break
+
+    labels = _nearest_centroid(X, centroids)
+    inertia = float(((X - centroids[labels]) ** 2).sum())
+    return centroids, labels, inertia, iterations
+
+def kmeans_representatives(X, centroids, labels):
+    """Indices of the point closest to each non-empty cluster's centroid, one per cluster."""
+    d2 = ((X - centroids[labels]) ** 2).sum(axis=1)
+    order = np.lexsort((d2, labels))
+    _, first = np.unique(labels[order], return_index=True)
+    return order[first]
+
+def kmeans_selection_and_distribution(perspectives: list, seed: int = 0, text_features: int = 0):
+    """
+    Clusters all perspectives into determine_target_size(n) groups and keeps the
+    perspective closest to each centroid, split into leftist/rightist/common by
+    the same bias thresholds as the stratified mode.
+    """
+    total_perspectives = len(perspectives)
+    target_k = determine_target_size(total_perspectives)
+    print(f"Based on {total_perspectives} inputs, clustering into {target_k} groups.")
+
+    if target_k == total_perspectives:
+        chosen = list(perspectives)
+    else:
+        X = build_feature_matrix(perspectives, text_features=text_features)
+        centroids, labels, inertia, iterations = kmeans(X, target_k, seed=seed)
+        print(f"k-means converged after {iterations} iterations (inertia {inertia:.4f}).")
+        chosen = [perspectives[i] for i in kmeans_representatives(X, centroids, labels)]
+
+    leftist, rightist, common = split_by_bias(chosen)
+    print(f"Cluster representatives: {len(leftist)} Leftist, {len(common)} Common, {len(rightist)} Rightist.")
+    return leftist, rightist, common
+
+def split_by_bias(chosen: list):
+    """Splits selected perspectives into (leftist, rightist, common) pools, each sorted by significance."""
+    leftist = [p for p in chosen if p.get('bias_x', 0.5) < LEFTIST_THRESHOLD]
+    rightist = [p for p in chosen if p.get('bias_x', 0.5) > RIGHTIST_THRESHOLD]
+    common = [p for p in chosen if LEFTIST_THRESHOLD <= p.get('bias_x', 0.5) <= RIGHTIST_THRESHOLD]
+    for pool in (leftist, rightist, common):
+        pool.sort(key=lambda p: p['significance_y'], reverse=True)
+    return leftist, rightist, common
+
+# --- DIVERSITY-AWARE (MMR) SELECTION ---
+
+class SparseRows(namedtuple("SparseRows", "indptr indices data shape")):
+    """
+    Row-compressed (CSR) matrix: row i holds data[indptr[i]:indptr[i + 1]] in
+    columns indices[indptr[i]:indptr[i + 1]], sorted by column.
+    """
+
+    def toarray(self):
+        """Returns the dense float64 matrix."""
+        X = np.zeros(self.shape, dtype=np.float64)
+        rows = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+        X[rows, self.indices] = self.data
+        return X
+
+def tfidf_matrix(texts: list, dims: int = 512):
+    """
+    Builds hashed TF-IDF vectors for texts as a SparseRows matrix of shape
+    (n, dims): sublinear term frequency (1 + log tf), smoothed idf, rows
+    L2-normalized so dot products are cosine similarities. Only the non-zero
+    cells are stored; texts without words get an empty row.
+    """
+    n = len(texts)
+    cells, counts = np.unique(_hashed_cells(texts, dims), return_counts=True)
+    rows, columns = np.divmod(cells, dims)
+    idf = np.log((1.0 + n) / (1.0 + np.bincount(columns, minlength=dims))) + 1.0
+    weights = (1.0 + np.log(counts)) * idf[columns]
+    weights /= np.sqrt(np.bincount(rows, weights=weights * weights, minlength=n))[rows]
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=n))))
+    return SparseRows(indptr, columns, weights, (n, dims))
+
+def _column_index(X):
+    """Column-compressed copy of a SparseRows matrix: (column pointers, rows, values)."""
+    # Column numbers fit in 16 bits for any practical dims, where the stable sort is a radix sort
+    order = np.argsort(X.indices.astype(np.int16) if X.shape[1] <= 1 << 15 else X.indices, kind='stable')
+    rows = np.repeat(np.arange(X.shape[0]), np.diff(X.indptr))[order]
+    colptr = np.concatenate(([0], np.cumsum(np.bincount(X.indices, minlength=X.shape[1]))))
+    return colptr, rows, X.data[order]
+
+def _sparse_similarities(X, columns_index, j):
+    """Dot products of every row of the SparseRows matrix X with its row j."""
+    colptr, col_rows, col_values = columns_index
+    start, end = X.indptr[j], X.indptr[j + 1]
+    columns, values = X.indices[start:end], X.data[start:end]
+    # Gather the entries of every column row j uses, scaled by row j's weight there
+    lengths = colptr[columns + 1] - colptr[columns]
+    offsets = np.repeat(colptr[columns] - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+    return np.bincount(col_rows[offsets], weights=col_values[offsets] * np.repeat(values, lengths),
+                       minlength=X.shape[0])
+
+def mmr_select(X, relevance, k: int, diversity: float = 0.3):
+    """
+    Greedy maximal marginal relevance over the rows of X (L2-normalized, a
+    SparseRows matrix or a dense array).
+
+    Each step picks the candidate maximizing
+    (1 - diversity) * relevance - diversity * (max cosine similarity to the picks so far),
+    so diversity=0 is plain top-k by relevance. Each step only computes the
+    similarities to the newest pick: for a sparse X from the columns that pick
+    uses (a column-compressed copy is built once), for a dense X with one
+    matrix-vector product. Ties go to the earlier row.
+    Returns the picked row indices in pick order.
+    """
+    if isinstance(X, SparseRows):
+        columns_index = _column_index(X)
+        n = X.shape[0]
+        similarities = lambda j: _sparse_similarities(X, columns_index, j)
+    else:
+        X = np.asarray(X, dtype=np.float64)
+        n = X.shape[0]
+        similarities = lambda j: X @ X[j]
+    k = min(k, n)
+    base = (1.0 - diversity) * np.asarray(relevance, dtype=np.float64)
+    max_sim = np.zeros(n, dtype=np.float64)
+    taken = np.zeros(n, dtype=bool)
+    picked = np.empty(k, dtype=np.intp)
+    for step in range(k):
+        scores = base - diversity * max_sim
+        scores[taken] = -np.inf
+        j = int(scores.argmax())
+        picked[step] = j
+        taken[j] = True
+        np.maximum(max_sim, similarities(j), out=max_sim)
+    return picked
+
+# determine_target_size keeps every perspective above 136 inputs; MMR still
+# picks this many there, the size of the largest defined range
+MMR_MAX_TARGET = 28
+
+def mmr_selection_and_distribution(perspectives: list, diversity: float = 0.3, text_features: int = 512):
+    """
+    Keeps determine_target_size(n) perspectives, at most MMR_MAX_TARGET, picked
+    by maximal marginal relevance: significance_y (a 0-1 score) as relevance,
+    cosine similarity of hashed TF-IDF text vectors as redundancy. Split into
+    leftist/rightist/common by the same bias thresholds as the stratified mode.
+    """
+    total_perspectives = len(perspectives)
+    target_k = min(determine_target_size(total_perspectives), MMR_MAX_TARGET)
+    print(f"Based on {total_perspectives} inputs, picking {target_k} significant and diverse perspectives.")
+
+    if target_k == total_perspectives:
+        chosen = list(perspectives)
+    else:
+        X = tfidf_matrix([p.get('text', '') for p in perspectives], dims=text_features)
+        significance = [p.get('significance_y', 0.0) for p in perspectives]
+        chosen = [perspectives[i] for i in mmr_select(X, significance, target_k, diversity=diversity).tolist()]
+
+    leftist, rightist, common = split_by_bias(chosen)
+    print(f"MMR selection: {len(leftist)} Leftist, {len(common)} Common, {len(rightist)} Rightist.")
+    return leftist, rightist, common
+
 # --- SAVE AND VISUALIZATION FUNCTIONS (No logic changes) ---
 def save_agents_data(leftist_data, rightist_data, common_data, output_dir="."):
     """Saves the distributed perspectives to separate JSON files."""
@@ -115,8 +556,47 @@ def save_agents_data(leftist_data, rightist_data, common_data, output_dir="."):
     with open(os.path.join(output_dir, 'common.json'), 'w', encoding='utf-8') as f:
         json.dump(common_data, f, indent=4)
 
-def create_visualization(leftist_data, rightist_data, common_data, original_topic, output_dir="."):
-    """Creates and saves a scatter plot visualizing the perspective distribution."""
+# Background zones and point colors of the debate visualization: (name, start, end, zone color, point color)
+VISUALIZATION_ZONES = [
+    ('Leftist', 0.0, 3*0.143, 'red', '#E63946'),
+    ('Common', 3*0.143, 4*0.143, 'green', '#588157'),
+    ('Rightist', 4*0.143, 1.0, 'purple', '#6A057F'),
+]
+
+def visualization_spec(leftist_data, rightist_data, common_data, original_topic):
+    """
+    Compact JSON-ready description of the debate visualization for the frontend:
+    the zones plus columnar points (bias, significance, zone index), so no
+    raster image has to be rendered. Also used as the chart's render cache key.
+    """
+    x, y, zone = [], [], []
+    for index, pool in enumerate((leftist_data, common_data, rightist_data)):
+        for p in pool:
+            x.append(round(p['bias_x'], 4))
+            y.append(round(p['significance_y'], 4))
+            zone.append(index)
+    return {
+        "chart": "debate_visualization",
+        "topic": original_topic,
+        "zones": [{"name": name, "start": round(start, 4), "end": round(end, 4), "color": point_color}
+                  for name, start, end, _, point_color in VISUALIZATION_ZONES],
+        "points": {"x": x, "y": y, "zone": zone},
+    }
+
+def save_chart_spec(spec, output_dir="."):
+    """Writes a chart spec as compact JSON to chart_spec.json."""
+    with open(os.path.join(output_dir, 'chart_spec.json'), 'w', encoding='utf-8') as f:
+        json.dump(spec, f, ensure_ascii=False, separators=(',', ':'))
+
+def create_visualization(leftist_data, rightist_data, common_data, original_topic, output_dir=".", output_path=None):
+    """
+    Creates and saves a scatter plot visualizing the perspective distribution,
+    to output_path if given, else to debate_visualization.png in output_dir.
+    """
+    # Imported here so callers that only need the selection never load matplotlib
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
     LEFTIST_THRESHOLD, RIGHTIST_THRESHOLD = 3*0.143, 4*0.143
     plt.style.use('seaborn-v0_8-darkgrid')
     fig, ax = plt.subplots(figsize=(15, 9))
@@ -147,16 +627,199 @@ def create_visualization(leftist_data, rightist_data, common_data, original_topi
     fig.tight_layout()
     
     # Save the plot to a file
-    output_path = os.path.join(output_dir, 'debate_visualization.png')
+    output_path = output_path or os.path.join(output_dir, 'debate_visualization.png')
     plt.savefig(output_path) # Updated thresholds
+    plt.close(fig)
     # ... (rest of the plotting code is unchanged, but will use the new thresholds)
 
+# Selection strategies accepted by select_and_distribute
+SELECTION_MODES = ("stratified", "kmeans", "mmr")
+
+def select_and_distribute(perspectives: list, mode: str = "stratified", seed: int = 0, diversity: float = 0.3,
+                          text_features=None):
+    """
+    Dispatches to the 'stratified' (bias bands + significance), 'kmeans' or 'mmr' selection.
+    text_features sets the hashed text dimensions of the kmeans and mmr modes;
+    None keeps each mode's default (0 for kmeans, 512 for mmr).
+    """
+    features = {} if text_features is None else {"text_features": text_features}
+    if mode == "kmeans":
+        return kmeans_selection_and_distribution(perspectives, seed=seed, **features)
+    if mode == "mmr":
+        return mmr_selection_and_distribution(perspectives, diversity=diversity, **features)
+    if mode not in SELECTION_MODES:
+        raise ValueError(f"Unknown selection mode: {mode}")
+    return stratified_selection_and_distribution(perspectives)
+
+def run_clustering(perspectives: list, output_dir=None, topic=None, visualize=False, mode="stratified", seed=0,
+                   diversity=0.3, chart_spec=False, text_features=None):
+    """
+    Runs the selection on an in-memory perspective list, for callers that
+    import this module instead of running it as a script.
+
+    The three agent files are written when output_dir is given, and the
+    visualization only when visualize is also set; chart_spec writes the
+    compact chart_spec.json instead of (or besides) rendering the image.
+    text_features is passed to select_and_distribute.
+    Returns a dict with the 'leftist', 'rightist' and 'common' selections.
+    """
+    leftist_args, rightist_args, shared_args = select_and_distribute(
+        perspectives or [], mode=mode, seed=seed, diversity=diversity, text_features=text_features
+    )
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        save_agents_data(leftist_args, rightist_args, shared_args, output_dir=output_dir)
+        if chart_spec:
+            save_chart_spec(visualization_spec(leftist_args, rightist_args, shared_args, topic), output_dir=output_dir)
+        if visualize:
+            create_visualization(leftist_args, rightist_args, shared_args, topic, output_dir=output_dir)
+    return {"leftist": leftist_args, "rightist": rightist_args, "common": shared_args}
+
+# --- BATCH PROCESSING ---
+
+def find_output_files(source: str):
+    """
+    Expands a glob pattern, or a directory searched recursively for output*.json
+    (e.g. runs/<run_id>/output.json), into a sorted list of files.
+    """
+    if os.path.isdir(source):
+        source = os.path.join(source, "**", "output*.json")
+    return sorted(path for path in glob.glob(source, recursive=True) if os.path.isfile(path))
+
+def _topic_output_name(path: str, root: str) -> str:
+    """Mirrors the input tree under the batch output directory; a file named output.json maps to its directory."""
+    relative = os.path.splitext(os.path.relpath(path, root))[0]
+    if os.path.basename(relative) == "output" and os.path.dirname(relative):
+        relative = os.path.dirname(relative)
+    return relative
+
+def process_output_file(path: str, output_dir: str, mode: str = "stratified", seed: int = 0,
+                        diversity: float = 0.3, visualize: bool = False):
+    """
+    Runs the selection for one pipeline output file and writes its agent files
+    to output_dir. The per-topic progress messages are suppressed so parallel
+    workers do not interleave them. Returns the file's summary index entry.
+    """
+    entry = {"input": path, "output_dir": output_dir}
+    start = time.perf_counter()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        perspectives = data.get("perspectives") or []
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = run_clustering(
+                perspectives, output_dir=output_dir, topic=data.get("input"),
+                visualize=visualize, mode=mode, seed=seed, diversity=diversity
+            )
+        entry.update(
+            topic=data.get("input"), perspectives=len(perspectives),
+            **{group: len(selected) for group, selected in result.items()}
+        )
+    except Exception as e:
+        entry["error"] = f"{type(e).__name__}: {e}"
+    entry["seconds"] = round(time.perf_counter() - start, 4)
+    return entry
+
+def run_batch(files: list, output_dir: str, workers=None, mode: str = "stratified", seed: int = 0,
+              diversity: float = 0.3, visualize: bool = False, worker=None):
+    """
+    Clusters many output files across a process pool (one file per task, so
+    throughput scales with the number of workers) and writes each topic's
+    leftist/rightist/common.json under output_dir, mirroring the input tree.
+    A summary of every file is written to output_dir/index.json and returned.
+
+    worker replaces process_output_file as the per-file task. Processes started
+    with spawn (Windows, macOS) import it by module path, which this file's
+    name does not allow, so importers pass a wrapper from an importable module
+    (modules.clustering does).
+    """
+    worker = worker or process_output_file
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files) or 1))
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in files]) if files else "."
+    tasks = [
+        (path, os.path.join(output_dir, _topic_output_name(os.path.abspath(path), root)))
+        for path in files
+    ]
+    print(f"Processing {len(files)} files with {workers} worker(s)...")
+    start = time.perf_counter()
+    entries = [None] * len(tasks)
+    if workers == 1:
+        for i, (path, topic_dir) in enumerate(tasks):
+            entries[i] = worker(path, topic_dir, mode, seed, diversity, visualize)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(worker, path, topic_dir, mode, seed, diversity, visualize): i
+                for i, (path, topic_dir) in enumerate(tasks)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                try:
+                    entries[i] = future.result()
+                except Exception as e:
+                    # A worker that could not start or died (BrokenProcessPool) fails its files, not the batch
+                    path, topic_dir = tasks[i]
+                    entries[i] = {"input": path, "output_dir": topic_dir, "error": f"{type(e).__name__}: {e}"}
+                if done % 50 == 0:
+                    print(f"  {done}/{len(tasks)} files done")
+
+    failed = [e for e in entries if "error" in e]
+    for entry in failed:
+        print(f"!!! ERROR: {entry['input']}: {entry['error']}")
+    index = {
+        "mode": mode,
+        "files": len(entries),
+        "succeeded": len(entries) - len(failed),
+        "failed": len(failed),
+        "workers": workers,
+        "elapsed_seconds": round(time.perf_counter() - start, 3),
+        "topics": entries,
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, 'index.json'), 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    print(f"Processed {index['succeeded']}/{len(entries)} files in {index['elapsed_seconds']}s; "
+          f"summary written to {os.path.join(output_dir, 'index.json')}")
+    return index
+
 # Main execution block
 if __name__ == "__main__":
     # --- CONFIGURATION ---
+    import argparse
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    DATA_FILENAME = os.path.join(script_dir, "../output.json")
-    output_directory = os.path.join(script_dir, "../final_output")
+    parser = argparse.ArgumentParser(description="Select and distribute perspectives for the debate agents.")
+    parser.add_argument("--input", default=os.path.join(script_dir, "../output.json"),
+                        help="Pipeline output.json to read")
+    parser.add_argument("--output-dir", default=os.path.join(script_dir, "../final_output"),
+                        help="Directory for leftist/rightist/common.json")
+    parser.add_argument("--mode", choices=SELECTION_MODES, default="stratified",
+                        help="Selection strategy: fixed bias bands, k-means cluster representatives, "
+                             "or significant and textually diverse perspectives (MMR)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for k-means initialization")
+    parser.add_argument("--diversity", type=float, default=0.3,
+                        help="MMR trade-off between significance (0) and text diversity (1)")
+    parser.add_argument("--batch", metavar="GLOB_OR_DIR",
+                        help="Process many output files (a glob, or a directory searched for output*.json) "
+                             "into per-topic folders under --output-dir plus an index.json summary")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes for --batch (default: number of CPUs)")
+    parser.add_argument("--visualize", action="store_true",
+                        help="Also draw each topic's chart in --batch mode")
+    cli_args = parser.parse_args()
+
+    if cli_args.batch:
+        batch_files = find_output_files(cli_args.batch)
+        if not batch_files:
+            print(f"!!! ERROR: No output files match: {cli_args.batch}")
+            sys.exit(1)
+        summary = run_batch(
+            batch_files, cli_args.output_dir, workers=cli_args.workers, mode=cli_args.mode,
+            seed=cli_args.seed, diversity=cli_args.diversity, visualize=cli_args.visualize
+        )
+        sys.exit(1 if summary["failed"] else 0)
+
+    DATA_FILENAME = cli_args.input
+    output_directory = cli_args.output_dir
     os.makedirs(output_directory, exist_ok=True)
     
     # --- 1. LOAD DATA ---
@@ -169,7 +832,9 @@ if __name__ == "__main__":
     
     # --- 2. PERFORM STRATIFIED SELECTION AND DISTRIBUTION ---
     print("\nStarting adaptive selection and distribution process...")
-    leftist_args, rightist_args, shared_args = stratified_selection_and_distribution(all_perspectives)
+    leftist_args, rightist_args, shared_args = select_and_distribute(
+        all_perspectives, mode=cli_args.mode, seed=cli_args.seed, diversity=cli_args.diversity
+    )
 
     # --- 3. DISPLAY RESULTS ---
     print("\n" + "="*50)
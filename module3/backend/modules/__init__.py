@@ -3,9 +3,18 @@ Perspective Generator Modules
 
 This package contains modular components for the perspective generation system:
 - vertex_client: Vertex AI client and endpoint handling
+- rate_limiter: Token-bucket rate limiting shared by sync and async model calls
+- response_cache: Content-addressed on-disk cache of model responses
 - json_utils: JSON parsing, validation, and output handling  
 - prompt_builder: Prompt construction and text generation
 - perspective_utils: Scaffold generation and color grouping
+- dedup_index: MinHash/LSH near-duplicate detection for perspective texts
+- run_workspace: Per-run working directories and retention-based cleanup
+- clustering: In-process access to the stratified perspective selection
+- metrics: Counters, gauges and latency histograms with Prometheus/JSON export
+- tracing: Context-propagated spans exportable as Chrome trace-event JSON
+- import_timing: Lazy imports of heavy dependencies with first-import timings
+- chart_render: Background chart rendering with a content-addressed image cache
 """
 
 __version__ = "1.0.0"
\ No newline at end of file
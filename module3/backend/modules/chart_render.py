@@ -0,0 +1,185 @@
+"""
+Chart Render Module
+
+Draws chart images (matplotlib, plotly) on a background worker thread so a
+pipeline run or request never waits on a raster render, and caches every
+image on disk under a hash of the data it shows. Rendering the same chart
+again, e.g. a rerun of a topic with identical perspectives, copies the
+cached file instead of starting the plotting library.
+"""
+
+import hashlib
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from concurrent.futures import Future, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from modules.metrics import METRICS
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHART_CACHE_DIR = os.path.join(BACKEND_DIR, ".cache", "charts")
+
+METRICS.describe("chart_render_seconds", "histogram", "Duration of background chart renders by chart kind")
+METRICS.describe("chart_cache_hits_total", "counter", "Chart images served from the render cache")
+METRICS.describe("chart_render_failures_total", "counter", "Background chart renders that raised an error")
+
+
+def chart_key(kind: str, data: Any) -> str:
+    """Return the content hash identifying a chart of ``kind`` drawn from ``data``."""
+    material = json.dumps([kind, data], sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ChartRenderer:
+    """
+    Background renderer with a content-addressed image cache.
+
+    Renders run one at a time on a single daemon thread, since pyplot keeps
+    global state and is not thread-safe. Requests for a chart that is already
+    queued share its render.
+
+    Args:
+        cache_dir: Directory of cached images, named <hash><extension>
+        max_entries: Cached images beyond this count are removed, oldest first
+    """
+
+    def __init__(self, cache_dir: str = CHART_CACHE_DIR, max_entries: int = 256):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.hits = 0
+        self.renders = 0
+        self._queue: "queue.Queue[Tuple[str, str, str, Callable[[str], Any]]]" = queue.Queue()
+        self._waiters: Dict[str, List[Tuple[Future, str]]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, kind: str, data: Any, render: Callable[[str], Any], output_path: str) -> Future:
+        """
+        Produce ``output_path`` from the cache, or render it in the background.
+
+        Args:
+            kind: Chart type, part of the cache key
+            data: JSON-serializable data the chart shows (hashed for the cache key)
+            render: Callable drawing the chart into the path it is given
+            output_path: Where the image is placed; its extension selects the format
+
+        Returns:
+            Future resolving to output_path once the image is in place
+        """
+        extension = os.path.splitext(output_path)[1] or ".png"
+        key = chart_key(kind, data) + extension
+        cached = os.path.join(self.cache_dir, key)
+        future: Future = Future()
+        with self._lock:
+            if key in self._waiters:
+                self._waiters[key].append((future, output_path))
+                return future
+            hit = os.path.exists(cached)
+            if hit:
+                self.hits += 1
+            else:
+                self._waiters[key] = [(future, output_path)]
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="chart-render", daemon=True)
+                    self._thread.start()
+        if hit:
+            METRICS.inc("chart_cache_hits_total", kind=kind)
+            self._place(cached, [(future, output_path)])
+        else:
+            self._queue.put((kind, key, cached, render))
+        return future
+
+    def pending(self) -> List[Future]:
+        """Return the futures of renders that have not finished yet."""
+        with self._lock:
+            return [future for waiters in self._waiters.values() for future, _ in waiters]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache hit and render counts."""
+        with self._lock:
+            return {"hits": self.hits, "renders": self.renders, "queued": len(self._waiters)}
+
+    @staticmethod
+    def _place(cached: str, waiters: List[Tuple[Future, str]]) -> None:
+        for future, output_path in waiters:
+            try:
+                if os.path.abspath(output_path) != os.path.abspath(cached):
+                    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+                    shutil.copyfile(cached, output_path)
+                future.set_result(output_path)
+            except Exception as e:
+                future.set_exception(e)
+
+    def _run(self) -> None:
+        while True:
+            kind, key, cached, render = self._queue.get()
+            start = time.perf_counter()
+            error = None
+            # Rendered under a temporary name so a failed render never leaves a partial image in the cache
+            root, extension = os.path.splitext(cached)
+            partial = f"{root}.{os.getpid()}.partial{extension}"
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                render(partial)
+                os.replace(partial, cached)
+                METRICS.observe("chart_render_seconds", time.perf_counter() - start, kind=kind)
+            except Exception as e:
+                error = e
+                if os.path.exists(partial):
+                    os.remove(partial)
+                METRICS.inc("chart_render_failures_total", kind=kind)
+                print(f"[warn] Rendering {kind} chart failed: {e}")
+            with self._lock:
+                waiters = self._waiters.pop(key, [])
+                if error is None:
+                    self.renders += 1
+            if error is None:
+                self._place(cached, waiters)
+                self._prune()
+            else:
+                for future, _ in waiters:
+                    future.set_exception(error)
+            self._queue.task_done()
+
+    def _prune(self) -> None:
+        try:
+            entries = [entry for entry in os.scandir(self.cache_dir) if entry.is_file() and ".partial" not in entry.name]
+        except FileNotFoundError:
+            return
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[: len(entries) - self.max_entries]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+_renderer: Optional[ChartRenderer] = None
+_renderer_lock = threading.Lock()
+
+
+def get_renderer() -> ChartRenderer:
+    """Return the process-wide chart renderer, created on first use."""
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = ChartRenderer()
+    return _renderer
+
+
+def render_in_background(kind: str, data: Any, render: Callable[[str], Any], output_path: str) -> Future:
+    """Submit a chart to the process-wide renderer (see ChartRenderer.submit)."""
+    return get_renderer().submit(kind, data, render, output_path)
+
+
+def wait_for_pending_renders(timeout: Optional[float] = None) -> None:
+    """Block until queued chart renders finish, e.g. before the process exits."""
+    if _renderer is not None:
+        wait(_renderer.pending(), timeout=timeout)
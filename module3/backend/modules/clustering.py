@@ -0,0 +1,52 @@
+"""
+Clustering Module
+
+Importable entry point for the perspective selection in
+TOP-N_K_MEANS-CLUSTERING.py. The script's file name is not a valid module
+name, so it is loaded once from its path here and its functions re-exported,
+letting servers cluster the in-memory perspectives without spawning a Python
+subprocess per run.
+"""
+
+import importlib.util
+import os
+
+CLUSTERING_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "TOP-N_K_MEANS-CLUSTERING.py")
+
+_spec = importlib.util.spec_from_file_location("top_n_k_means_clustering", CLUSTERING_FILE)
+_clustering = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_clustering)
+
+determine_target_size = _clustering.determine_target_size
+stratified_selection_and_distribution = _clustering.stratified_selection_and_distribution
+stratified_selection_batch = _clustering.stratified_selection_batch
+stratified_selection_indices = _clustering.stratified_selection_indices
+kmeans_selection_and_distribution = _clustering.kmeans_selection_and_distribution
+SELECTION_MODES = _clustering.SELECTION_MODES
+select_and_distribute = _clustering.select_and_distribute
+build_feature_matrix = _clustering.build_feature_matrix
+kmeans = _clustering.kmeans
+hashed_term_counts = _clustering.hashed_term_counts
+SparseRows = _clustering.SparseRows
+split_by_bias = _clustering.split_by_bias
+mmr_selection_and_distribution = _clustering.mmr_selection_and_distribution
+tfidf_matrix = _clustering.tfidf_matrix
+mmr_select = _clustering.mmr_select
+save_agents_data = _clustering.save_agents_data
+create_visualization = _clustering.create_visualization
+visualization_spec = _clustering.visualization_spec
+save_chart_spec = _clustering.save_chart_spec
+run_clustering = _clustering.run_clustering
+find_output_files = _clustering.find_output_files
+process_output_file = _clustering.process_output_file
+
+
+def _process_output_file(*args):
+    """run_batch's pool task; spawned worker processes import it as modules.clustering."""
+    return _clustering.process_output_file(*args)
+
+
+def run_batch(*args, **kwargs):
+    """The script's run_batch, with a per-file task that spawned worker processes can import."""
+    kwargs.setdefault("worker", _process_output_file)
+    return _clustering.run_batch(*args, **kwargs)
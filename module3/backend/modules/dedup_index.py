@@ -0,0 +1,153 @@
+"""
+Near-Duplicate Index Module
+
+MinHash signatures over character and word shingles with LSH banding, used
+to reject perspective texts that are punctuation variants or light rewordings
+of texts that were already accepted. Insert and lookup cost does not grow with
+the number of stored texts.
+
+Texts that differ only in a negation ("should" / "should not") share almost
+every shingle but state opposite stances, so two texts are only duplicates
+when they also carry the same negation words.
+"""
+
+import re
+import zlib
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+
+# Mersenne prime for the universal hash family (a * h + b) mod p
+_PRIME = (1 << 31) - 1
+_NON_WORD = re.compile(r"[^\w]+", re.UNICODE)
+_CONTRACTED_NOT = re.compile(r"n['\u2019]t\b")
+NEGATIONS = frozenset({
+    "not", "no", "never", "nor", "neither", "none", "nobody", "nothing", "nowhere", "cannot", "without",
+})
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse punctuation/whitespace so variants compare equal."""
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def negation_words(text: str) -> tuple:
+    """Sorted negation words of ``text``, with contractions ("doesn't") counted as "not"."""
+    words = _NON_WORD.sub(" ", _CONTRACTED_NOT.sub(" not", text.lower())).split()
+    return tuple(sorted(word for word in words if word in NEGATIONS))
+
+
+class NearDuplicateIndex:
+    """
+    Set-like index of texts where membership means "near-duplicate of a stored text".
+
+    It can be used wherever the pipeline previously passed a ``Set[str]`` of
+    existing texts: ``add``, ``in``, ``len``, iteration (insertion order) and
+    ``copy`` behave like the set, but ``text in index`` is also true for texts
+    whose estimated Jaccard similarity to a stored text reaches ``threshold``
+    and whose negation words match (see negation_words).
+
+    Args:
+        threshold: Estimated Jaccard similarity at or above which texts are duplicates
+        num_perm: Number of MinHash permutations (signature length)
+        bands: Number of LSH bands; must divide num_perm
+        shingle_size: Character shingle length on the normalized text; word
+            unigrams and bigrams are added to the character shingles
+        seed: Seed for the hash permutations
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 4,
+        seed: int = 1,
+    ):
+        if num_perm % bands:
+            raise ValueError("bands must divide num_perm")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _PRIME, size=(num_perm, 1)).astype(np.uint64)
+        self._b = rng.randint(0, _PRIME, size=(num_perm, 1)).astype(np.uint64)
+        self._texts: List[str] = []
+        self._normalized: Dict[str, int] = {}
+        self._signatures: List[np.ndarray] = []
+        self._negations: List[tuple] = []
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+
+    def _signature(self, normalized: str) -> np.ndarray:
+        k = self.shingle_size
+        if len(normalized) <= k:
+            shingles = {normalized}
+        else:
+            shingles = {normalized[i:i + k] for i in range(len(normalized) - k + 1)}
+        # A replaced word changes only a few character shingles; its word
+        # shingles (prefixed apart from the character ones) weigh it more
+        words = normalized.split()
+        shingles.update("\x00" + word for word in words)
+        shingles.update(f"\x00{a} {b}" for a, b in zip(words, words[1:]))
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles)
+        )
+        return ((self._a * hashes + self._b) % _PRIME).min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        r = self.rows
+        return [signature[i * r:(i + 1) * r].tobytes() for i in range(self.bands)]
+
+    def find(self, text: str) -> Optional[str]:
+        """Return the stored text that ``text`` duplicates, or None."""
+        normalized = normalize_text(text)
+        if normalized in self._normalized:
+            return self._texts[self._normalized[normalized]]
+        if not normalized or not self._texts:
+            return None
+        signature = self._signature(normalized)
+        negations = negation_words(text)
+        candidates = set()
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(key, ()))
+        for doc in sorted(candidates):
+            if self._negations[doc] == negations and np.mean(self._signatures[doc] == signature) >= self.threshold:
+                return self._texts[doc]
+        return None
+
+    def add(self, text: str) -> None:
+        """Store ``text``; exact normalized repeats are ignored."""
+        normalized = normalize_text(text)
+        if normalized in self._normalized:
+            return
+        doc = len(self._texts)
+        signature = self._signature(normalized)
+        self._texts.append(text)
+        self._normalized[normalized] = doc
+        self._signatures.append(signature)
+        self._negations.append(negation_words(text))
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(key, []).append(doc)
+
+    def copy(self) -> "NearDuplicateIndex":
+        """Return an independent index with the same contents and parameters."""
+        clone = NearDuplicateIndex.__new__(NearDuplicateIndex)
+        clone.__dict__.update(self.__dict__)
+        clone._texts = list(self._texts)
+        clone._normalized = dict(self._normalized)
+        clone._signatures = list(self._signatures)
+        clone._negations = list(self._negations)
+        clone._buckets = [{k: list(v) for k, v in bucket.items()} for bucket in self._buckets]
+        return clone
+
+    def __contains__(self, text: object) -> bool:
+        return isinstance(text, str) and self.find(text) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._texts)
+
+    def __len__(self) -> int:
+        return len(self._texts)
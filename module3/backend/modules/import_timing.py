@@ -0,0 +1,46 @@
+"""
+Import Timing Module
+
+Loads heavy modules (google-genai, the generation pipeline, the clustering
+script) on first use instead of at startup, and records how long each first
+import took so servers can report where their cold-start time goes.
+matplotlib and plotly are imported inside the plotting functions instead.
+"""
+
+import importlib
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Dict
+
+# Seconds spent on the first import of each module loaded through lazy_import
+IMPORT_TIMES: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Import ``name`` on first use and record the time the import took.
+
+    Args:
+        name: Dotted module name
+
+    Returns:
+        The imported module (from sys.modules on later calls)
+    """
+    if name in sys.modules:
+        # import_module returns it directly, or waits on the module's import
+        # lock while another thread (e.g. the startup preload) is importing it
+        return importlib.import_module(name)
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    with _lock:
+        IMPORT_TIMES.setdefault(name, round(time.perf_counter() - start, 4))
+    return module
+
+
+def import_times() -> Dict[str, float]:
+    """Return a copy of the recorded first-import durations."""
+    with _lock:
+        return dict(IMPORT_TIMES)
@@ -2,16 +2,58 @@
 JSON Utilities Module
 
 Handles JSON parsing, validation, and output operations for perspective generation.
-Includes robust parsing for various model output formats.
+Includes robust parsing for various model output formats and an incremental
+parser for streamed responses.
 """
 
 import json
-from typing import Any, Dict, List, Optional
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+
+_DECODER = json.JSONDecoder()
+
+# Background writer threads started by write_output_async that have not been joined
+_pending_writes: List[threading.Thread] = []
+_pending_lock = threading.Lock()
+
+
+# Whole string literals are matched (and skipped) by the regex engine; a lone
+# quote means an unterminated string that runs to the end of the text.
+_OBJECT_TOKENS = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|["{}]', re.S)
+_ARRAY_TOKENS = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|["\[\]{}]', re.S)
+
+
+def _matching_pairs(raw: str, tokens: "re.Pattern[str]", opener: str, start: int = 0) -> List[Tuple[int, int]]:
+    """
+    Return (open, close) index pairs of balanced brackets in a single pass.
+    
+    Brackets inside string literals (including escaped quotes) are ignored
+    and unclosed openers are left out. Pairs are returned in order of their
+    opener.
+    """
+    pairs: List[Tuple[int, int]] = []
+    stack: List[int] = []
+    for m in tokens.finditer(raw, start):
+        ch = m.group()
+        if ch == opener:
+            stack.append(m.start())
+        elif ch == '"':
+            break
+        elif len(ch) == 1:
+            if stack:
+                pairs.append((stack.pop(), m.start()))
+    pairs.sort()
+    return pairs
 
 
 def extract_json_array(raw: str) -> Optional[str]:
     """
-    Extract the first complete JSON array from raw text.
+    Extract the first complete top-level JSON array from raw text.
+    
+    The text is scanned from the start, so brackets inside string literals
+    or nested in a leading object are never taken as the array's opener.
     
     Args:
         raw: Raw text that may contain a JSON array
@@ -19,20 +61,60 @@ def extract_json_array(raw: str) -> Optional[str]:
     Returns:
         JSON array string if found, None otherwise
     """
-    start = raw.find("[")
-    if start == -1:
-        return None
+    start = -1
+    braces = 0
     depth = 0
-    for i, ch in enumerate(raw[start:], start=start):
-        if ch == "[":
+    for m in _ARRAY_TOKENS.finditer(raw):
+        ch = m.group()
+        if ch == '"':
+            break
+        if start == -1:
+            # Only a bracket outside any object starts the array
+            if ch == "{":
+                braces += 1
+            elif ch == "}":
+                braces = max(braces - 1, 0)
+            elif ch == "[" and braces == 0:
+                start = m.start()
+                depth = 1
+        elif ch == "[":
             depth += 1
         elif ch == "]":
             depth -= 1
             if depth == 0:
-                return raw[start : i + 1]
+                return raw[start : m.end()]
     return None
 
 
+def extract_json_objects(raw: str) -> List[Dict[str, Any]]:
+    """
+    Recover every valid top-level JSON object from text in one linear pass.
+    
+    Balanced ``{...}`` spans are located with a string-aware scan and decoded
+    in place with ``json.JSONDecoder.raw_decode``. Invalid spans are skipped
+    as a whole; objects nested inside an unclosed span are still recovered.
+    
+    Args:
+        raw: Raw text containing concatenated or partially broken objects
+        
+    Returns:
+        List of decoded objects in input order
+    """
+    objects: List[Dict[str, Any]] = []
+    skip_until = 0
+    for open_i, close_i in _matching_pairs(raw, _OBJECT_TOKENS, "{"):
+        if open_i < skip_until:
+            continue
+        skip_until = close_i + 1
+        try:
+            obj, end = _DECODER.raw_decode(raw, open_i)
+        except json.JSONDecodeError:
+            continue
+        if end == close_i + 1 and isinstance(obj, dict):
+            objects.append(obj)
+    return objects
+
+
 def parse_model_output(raw: str) -> List[Dict[str, Any]]:
     """
     Parse model output into a list of perspective objects.
@@ -56,7 +138,7 @@ def parse_model_output(raw: str) -> List[Dict[str, Any]]:
     if arr_text:
         try:
             data = json.loads(arr_text)
-            if isinstance(data, list):
+            if isinstance(data, list) and all(isinstance(item, dict) for item in data):
                 return data
         except json.JSONDecodeError:
             pass
@@ -72,46 +154,77 @@ def parse_model_output(raw: str) -> List[Dict[str, Any]]:
         except json.JSONDecodeError:
             pass
     
-    # Case 2: Multiple concatenated objects - try to fix
+    # Case 2: Multiple concatenated objects - recover every valid one
     if raw_clean.startswith('{'):
-        # Find all complete JSON objects
-        objects = []
-        pos = 0
-        while pos < len(raw_clean):
-            # Find start of next object
-            start = raw_clean.find('{', pos)
-            if start == -1:
-                break
-            
-            # Find matching closing brace
-            depth = 0
-            end = start
-            for i in range(start, len(raw_clean)):
-                if raw_clean[i] == '{':
-                    depth += 1
-                elif raw_clean[i] == '}':
-                    depth -= 1
-                    if depth == 0:
-                        end = i
-                        break
-            
-            if depth == 0:  # Found complete object
-                try:
-                    obj_text = raw_clean[start:end+1]
-                    obj = json.loads(obj_text)
-                    if isinstance(obj, dict):
-                        objects.append(obj)
-                except json.JSONDecodeError:
-                    pass
-            
-            pos = end + 1
-        
+        objects = extract_json_objects(raw_clean)
         if objects:
             return objects
     
     raise ValueError("Could not parse any valid JSON objects from model output")
 
 
+class StreamingObjectParser:
+    """
+    Incremental parser that yields JSON objects as soon as they are complete.
+    
+    Feed it the model's text chunk by chunk; every top-level ``{...}`` object
+    (inside an array or concatenated) is returned from :meth:`feed` the moment
+    its closing brace arrives. Braces inside string literals are ignored.
+    """
+    
+    def __init__(self):
+        self._pending: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+    
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Consume a chunk of model output.
+        
+        Args:
+            chunk: Next piece of streamed text
+            
+        Returns:
+            List of objects completed by this chunk (possibly empty)
+        """
+        objects: List[Dict[str, Any]] = []
+        start = 0 if self._depth else None
+        for i, ch in enumerate(chunk):
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    start = i
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._pending.append(chunk[start : i + 1])
+                    obj_text = "".join(self._pending)
+                    self._pending = []
+                    start = None
+                    try:
+                        obj = json.loads(obj_text)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(obj, dict):
+                        objects.append(obj)
+        if self._depth and start is not None:
+            self._pending.append(chunk[start:])
+        return objects
+
+
 def write_output(path: str, data: Any) -> None:
     """
     Write data to JSON file with proper formatting.
@@ -126,6 +239,44 @@ def write_output(path: str, data: Any) -> None:
     print(f"[info] Generated {perspective_count} perspectives → {path}")
 
 
+def write_output_async(path: str, data: Any) -> threading.Thread:
+    """
+    Write data to a JSON file on a background thread.
+    
+    The thread is not a daemon, so the interpreter finishes the write before
+    exiting; callers that hand the file to another process should call
+    wait_for_pending_writes() first.
+    
+    Args:
+        path: Output file path
+        data: Data to write (must not be modified while the write is pending)
+        
+    Returns:
+        The started writer thread
+    """
+    def write():
+        try:
+            write_output(path, data)
+        except Exception as e:
+            print(f"[warn] Failed to write {path}: {e}")
+
+    thread = threading.Thread(target=write, name="write-output")
+    with _pending_lock:
+        _pending_writes[:] = [t for t in _pending_writes if t.is_alive()]
+        _pending_writes.append(thread)
+    thread.start()
+    return thread
+
+
+def wait_for_pending_writes(timeout: Optional[float] = None) -> None:
+    """Block until all writes started by write_output_async have finished."""
+    with _pending_lock:
+        threads = list(_pending_writes)
+        _pending_writes.clear()
+    for thread in threads:
+        thread.join(timeout)
+
+
 def load_input(path: str) -> tuple:
     """
     Load and validate input JSON file.
@@ -0,0 +1,166 @@
+"""
+Metrics Module
+
+Process-wide counters, gauges and latency histograms for the perspective
+pipeline. Model calls, parsing, repairs and pipeline stages record into the
+shared ``METRICS`` registry, which renders as Prometheus text exposition
+format or as a JSON-friendly dict.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of labelled counters, gauges and histograms.
+
+    Metrics are created on first use; ``describe`` only adds the help text
+    shown in the Prometheus output.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._types: Dict[str, str] = {}
+        self._help: Dict[str, str] = {}
+        self._values: Dict[str, Dict[LabelKey, Any]] = {}
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        """Register a metric's type ("counter", "gauge" or "histogram") and help text."""
+        with self._lock:
+            self._types[name] = kind
+            self._help[name] = help_text
+            self._values.setdefault(name, {})
+
+    def _series(self, name: str, kind: str) -> Dict[LabelKey, Any]:
+        self._types.setdefault(name, kind)
+        return self._values.setdefault(name, {})
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Add ``value`` to a counter."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series(name, "counter")
+            series[key] = series.get(key, 0) + value
+
+    def add(self, name: str, value: float, **labels: Any) -> None:
+        """Add ``value`` (which may be negative) to a gauge."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series(name, "gauge")
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        """Set a gauge to ``value``."""
+        key = _label_key(labels)
+        with self._lock:
+            self._series(name, "gauge")[key] = value
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **labels: Any) -> None:
+        """Record one observation in a histogram."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series(name, "histogram")
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        """Observe the duration of the ``with`` block in a histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return all metrics as a JSON-serializable dict."""
+        result: Dict[str, Any] = {}
+        with self._lock:
+            for name, series in self._values.items():
+                samples = []
+                for key, value in series.items():
+                    sample: Dict[str, Any] = {"labels": dict(key)}
+                    if isinstance(value, _Histogram):
+                        sample.update({
+                            "count": value.count,
+                            "sum": round(value.sum, 6),
+                            "buckets": dict(zip((str(b) for b in value.buckets), value.counts)),
+                        })
+                    else:
+                        sample["value"] = value
+                    samples.append(sample)
+                result[name] = {"type": self._types[name], "help": self._help.get(name, ""), "samples": samples}
+        return result
+
+    def render_prometheus(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in self._values.items():
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {self._types[name]}")
+                for key, value in series.items():
+                    if not isinstance(value, _Histogram):
+                        lines.append(f"{name}{_format_labels(key)} {value}")
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(value.buckets, value.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', str(bound)))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {value.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {value.sum:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {value.count}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+METRICS.describe("pipeline_stage_seconds", "histogram", "Duration of pipeline stages (generation, repair, clustering)")
+METRICS.describe("model_call_seconds", "histogram", "Latency of model calls by color group, including retries")
+METRICS.describe("model_call_retries_total", "counter", "Model call attempts retried after an error")
+METRICS.describe("model_rate_limited_total", "counter", "HTTP 429 responses that triggered a backoff")
+METRICS.describe("model_stream_bytes_total", "counter", "UTF-8 bytes of model text received by streaming")
+METRICS.describe("model_cache_hits_total", "counter", "Model calls answered from the response cache")
+METRICS.describe("parse_failures_total", "counter", "Model responses that could not be parsed as JSON")
+METRICS.describe("repair_items_total", "counter", "Perspectives sent through the repair path")
+METRICS.describe("fallbacks_total", "counter", "Fallback perspectives used in place of model output")
+METRICS.describe("websocket_clients", "gauge", "Connected WebSocket clients")
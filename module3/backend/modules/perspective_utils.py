@@ -2,10 +2,13 @@
 Perspective Utilities Module
 
 Handles scaffold generation, color assignments, and perspective validation
-for the structured perspective generation system.
+for the structured perspective generation system. Validation accepts either a
+plain set of texts or a NearDuplicateIndex to also reject near-duplicates.
 """
 
-from typing import Any, Dict, List, Set, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from modules.metrics import METRICS
 
 
 # Color spectrum for perspective assignment
@@ -82,7 +85,7 @@ def validate_and_categorize_perspectives(
     Args:
         group: Original perspective slots to fill
         generated: Generated perspectives from the model
-        existing_texts: Set of already used perspective texts
+        existing_texts: Set (or NearDuplicateIndex) of already used perspective texts
         
     Returns:
         Tuple of (valid_perspectives, items_needing_repair)
@@ -120,12 +123,54 @@ def validate_and_categorize_perspectives(
     return valid_perspectives, needs_repair
 
 
-def create_fallback_perspective(slot: Dict[str, Any]) -> Dict[str, Any]:
+# Fallback texts per bias band; alternatives are used when earlier ones are taken
+FALLBACK_TEXTS = {
+    "strong_a_red": [
+        "This represents a clear violation of democratic principles and electoral integrity.",
+        "Accountability demands that this be treated as a serious breach of public trust.",
+        "Letting this pass unchallenged would set a damaging precedent for future governance.",
+    ],
+    "strong_a": [
+        "There are concerning patterns that warrant serious investigation by authorities.",
+        "Independent oversight bodies should examine these developments without delay.",
+        "The available signals justify a formal inquiry rather than quiet dismissal.",
+    ],
+    "moderate_a": [
+        "While allegations deserve attention, we should wait for comprehensive evidence before drawing conclusions.",
+        "Concerns are understandable, yet verified facts must come before any firm judgement.",
+        "Caution is warranted: early reports rarely capture the full picture of events.",
+    ],
+    "neutral": [
+        "This situation requires careful analysis of all available evidence from multiple sources.",
+        "Balanced assessment means weighing the strongest arguments made by every side.",
+        "Outcomes will depend on details that neither camp has fully addressed yet.",
+    ],
+    "moderate_b": [
+        "These claims may be part of routine political discourse rather than substantive violations.",
+        "Much of the reaction reflects ordinary partisan positioning more than new facts.",
+        "Similar disputes have faded before once the practical stakes became clearer.",
+    ],
+    "strong_b": [
+        "This appears to be standard opposition criticism common in competitive elections.",
+        "Critics are amplifying a familiar grievance to score points with their base.",
+        "The outcry overstates the issue and ignores the broader record of performance.",
+    ],
+    "strong_b_violet": [
+        "Such accusations are typical political rhetoric without substantial basis in fact.",
+        "These charges look like a distraction engineered to dominate the news cycle.",
+        "Nothing presented so far substantiates the sweeping claims being circulated.",
+    ],
+}
+
+
+def create_fallback_perspective(slot: Dict[str, Any], existing_texts: Optional[Set[str]] = None) -> Dict[str, Any]:
     """
     Create a fallback perspective when repair fails.
     
     Args:
         slot: Original perspective slot (color, bias_x)
+        existing_texts: Optional set/index of used texts; the first fallback
+            variant for the slot's band that is not already used is chosen
         
     Returns:
         Fallback perspective object with proper text based on bias position
@@ -133,24 +178,24 @@ def create_fallback_perspective(slot: Dict[str, Any]) -> Dict[str, Any]:
     # Generate proper fallback text based on bias position and color
     bias_x = slot["bias_x"]
     color = slot["color"]
+    METRICS.inc("fallbacks_total", color=color)
     
-    # Create perspective text based on bias position
+    # Pick the fallback band based on bias position
     if bias_x < 0.2:  # Strong position A (red/orange)
-        if color == "red":
-            text = "This represents a clear violation of democratic principles and electoral integrity."
-        else:
-            text = "There are concerning patterns that warrant serious investigation by authorities."
+        band = "strong_a_red" if color == "red" else "strong_a"
     elif bias_x < 0.4:  # Moderate position A (yellow)
-        text = "While allegations deserve attention, we should wait for comprehensive evidence before drawing conclusions."
+        band = "moderate_a"
     elif bias_x < 0.6:  # Neutral/balanced (green)
-        text = "This situation requires careful analysis of all available evidence from multiple sources."
+        band = "neutral"
     elif bias_x < 0.8:  # Moderate position B (blue)
-        text = "These claims may be part of routine political discourse rather than substantive violations."
+        band = "moderate_b"
     else:  # Strong position B (indigo/violet)
-        if color == "violet":
-            text = "Such accusations are typical political rhetoric without substantial basis in fact."
-        else:
-            text = "This appears to be standard opposition criticism common in competitive elections."
+        band = "strong_b_violet" if color == "violet" else "strong_b"
+    
+    variants = FALLBACK_TEXTS[band]
+    text = variants[0]
+    if existing_texts is not None:
+        text = next((t for t in variants if t not in existing_texts), variants[0])
     
     return {
         "color": slot["color"],
@@ -171,7 +216,7 @@ def process_repair_results(
     Args:
         batch: List of items that needed repair
         repair_results: Results from repair model call
-        existing_texts: Set of texts to avoid duplicating
+        existing_texts: Set (or NearDuplicateIndex) of texts to avoid duplicating
         
     Returns:
         List of repaired perspective objects
@@ -201,12 +246,12 @@ def process_repair_results(
                 })
             else:
                 # Use fallback
-                fallback = create_fallback_perspective(slot)
+                fallback = create_fallback_perspective(slot, existing_texts)
                 existing_texts.add(fallback["text"])
                 repaired_perspectives.append(fallback)
         else:
             # No repair result, use fallback
-            fallback = create_fallback_perspective(slot)
+            fallback = create_fallback_perspective(slot, existing_texts)
             existing_texts.add(fallback["text"])
             repaired_perspectives.append(fallback)
     
@@ -8,10 +8,8 @@ with a color spectrum gradient from red to violet on the x-axis.
 
 import json
 import os
+import sys
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
 
 
 def load_output_data(output_path: str):
@@ -28,31 +26,96 @@ def load_output_data(output_path: str):
         return []
 
 
+# Rainbow bands over the bias axis: (start, end, name, color)
+BANDS = [
+    (0.0, 1/6, 'Red', '#FF0000'),
+    (1/6, 2/6, 'Orange', '#FF8000'),
+    (2/6, 3/6, 'Yellow', '#FFFF00'),
+    (3/6, 4/6, 'Green', '#00FF00'),
+    (4/6, 5/6, 'Blue', '#0000FF'),
+    (5/6, 1.0, 'Indigo/Violet', '#8B00FF')
+]
+OUT_OF_RANGE_COLOR = '#888888'
+_BAND_EDGES = np.array([end for _, end, _, _ in BANDS[:-1]])
+_BAND_COLORS = np.array([color for _, _, _, color in BANDS] + [OUT_OF_RANGE_COLOR])
+
+
+def assign_bands(bias_values):
+    """
+    Band index of each bias value: start <= x < end, with 1.0 in the last band.
+    Values outside [0, 1] (and NaN) get -1.
+    """
+    x = np.asarray(bias_values, dtype=np.float64)
+    bands = np.digitize(x, _BAND_EDGES)
+    return np.where((x >= 0.0) & (x <= 1.0), bands, -1)
+
+
+def band_colors(bias_values):
+    """Band color of each bias value (OUT_OF_RANGE_COLOR outside [0, 1])."""
+    return _BAND_COLORS[assign_bands(bias_values)]
+
+
+def perspective_chart_spec(perspectives):
+    """
+    Compact JSON-ready description of the perspective analysis chart for the
+    frontend: the bands plus columnar point data (bias, significance and band
+    index, -1 outside the bands), so no raster image has to be rendered.
+    """
+    x = np.array([p.get('bias_x', np.nan) for p in perspectives], dtype=np.float64)
+    y = np.array([p.get('significance_y', np.nan) for p in perspectives], dtype=np.float64)
+    keep = ~(np.isnan(x) | np.isnan(y))
+    return {
+        "chart": "perspective_analysis",
+        "bands": [{"start": round(start, 4), "end": round(end, 4), "name": name, "color": color}
+                  for start, end, name, color in BANDS],
+        "points": {
+            "x": np.round(x[keep], 4).tolist(),
+            "y": np.round(y[keep], 4).tolist(),
+            "band": assign_bands(x[keep]).tolist(),
+        },
+    }
+
+
 def plot_perspective_analysis(perspectives, output_path=None):
-    """Create a scatter plot with discrete rainbow bands and vertical separators."""
+    """
+    Create a scatter plot with discrete rainbow bands and vertical separators.
+
+    With output_path the image is rendered by the background chart renderer,
+    cached under the hash of perspective_chart_spec so identical data is not
+    drawn twice; the returned Future resolves to output_path. Without it the
+    plot is shown interactively.
+    """
     if not perspectives:
         print("No perspective data to plot")
-        return
+        return None
+
+    if output_path:
+        # Imported here so the plotter still runs as a standalone script
+        from modules.chart_render import render_in_background
+        future = render_in_background(
+            "perspective_analysis", perspective_chart_spec(perspectives),
+            lambda path: _perspective_figure(perspectives).write_image(path), output_path
+        )
+
+        def report(done):
+            if done.exception() is None:
+                print(f"Plot saved to: {output_path}")
+
+        future.add_done_callback(report)
+        return future
+    _perspective_figure(perspectives).show()
+    return None
 
-    df = pd.DataFrame(perspectives)
 
-    # Define rainbow bands
-    bands = [
-        (0.0, 1/6, 'Red', '#FF0000'),
-        (1/6, 2/6, 'Orange', '#FF8000'),
-        (2/6, 3/6, 'Yellow', '#FFFF00'),
-        (3/6, 4/6, 'Green', '#00FF00'),
-        (4/6, 5/6, 'Blue', '#0000FF'),
-        (5/6, 1.0, 'Indigo/Violet', '#8B00FF')
-    ]
-
-    # Assign color by band
-    def get_band_color(x):
-        for start, end, name, color in bands:
-            if start <= x < end or (end == 1.0 and x == 1.0):
-                return color
-        return '#888888'
-    df['band_color'] = df['bias_x'].apply(get_band_color)
+def _perspective_figure(perspectives):
+    """Build the plotly figure drawn by plot_perspective_analysis."""
+    # plotly and pandas are only needed once a plot is actually drawn
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    df = pd.DataFrame(perspectives)
+    bands = BANDS
+    df['band_color'] = band_colors(df['bias_x'].to_numpy(dtype=np.float64))
 
     # Create scatter plot
     fig = go.Figure()
@@ -119,17 +182,17 @@ def plot_perspective_analysis(perspectives, output_path=None):
         plot_bgcolor='white',
         showlegend=False
     )
-
-    # Save or show the plot
-    if output_path:
-        fig.write_image(output_path)
-        print(f"Plot saved to: {output_path}")
-    else:
-        fig.show()
+    return fig
 
 
 def main():
     """Main function to run the perspective analysis plotter."""
+    import argparse
+    parser = argparse.ArgumentParser(description="Plot bias vs significance of the generated perspectives.")
+    parser.add_argument("--spec", action="store_true",
+                        help="Write the compact chart spec (perspective_analysis.json) instead of rendering an image")
+    cli_args = parser.parse_args()
+
     # Find output.json in the parent directory
     script_dir = os.path.dirname(os.path.abspath(__file__))
     parent_dir = os.path.dirname(script_dir)
@@ -148,9 +211,21 @@ def main():
 
     print(f"Loaded {len(perspectives)} perspectives")
 
-    # Create plot
+    if cli_args.spec:
+        spec_path = os.path.join(parent_dir, 'perspective_analysis.json')
+        with open(spec_path, 'w', encoding='utf-8') as f:
+            json.dump(perspective_chart_spec(perspectives), f, ensure_ascii=False, separators=(',', ':'))
+        print(f"Chart spec saved to: {spec_path}")
+        return
+
+    # Create plot; the renderer's worker is a daemon thread, so wait for it here
+    if parent_dir not in sys.path:
+        sys.path.insert(0, parent_dir)
     plot_path = os.path.join(parent_dir, 'perspective_analysis.png')
-    plot_perspective_analysis(perspectives, plot_path)
+    try:
+        plot_perspective_analysis(perspectives, plot_path).result()
+    except Exception as e:
+        print(f"Error: Could not render the plot: {e}")
 
 
 if __name__ == "__main__":
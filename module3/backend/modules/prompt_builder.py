@@ -22,7 +22,7 @@ def build_color_prompt(statement: str, items: List[Dict[str, Any]], existing_tex
     Returns:
         JSON-formatted prompt string for the model
     """
-    used = list(existing_texts)[:120]  # Show recent perspectives to avoid
+    used = sorted(existing_texts)[:120]  # Stable order keeps prompts cacheable
     color = items[0]["color"] if items else "unknown"
     
     # Build more detailed context to help avoid duplicates
@@ -75,7 +75,7 @@ def build_repair_prompt(statement: str, repair_items: List[Dict[str, Any]], exis
     payload = {
         "input": statement,
         "repair_items": repair_items,
-        "avoid_texts": list(existing_texts)[:100],
+        "avoid_texts": sorted(existing_texts)[:100],
         "instructions": (
             f"Fix these {len(repair_items)} perspectives. Return ONLY a JSON array with EXACTLY {len(repair_items)} objects:\n"
             "[{\"color\":\"...\",\"bias_x\":...,\"significance_y\":...,\"text\":\"...\"},...]\n"
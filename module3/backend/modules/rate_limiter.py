@@ -0,0 +1,99 @@
+"""
+Rate Limiter Module
+
+Process-wide token-bucket rate limiting for model calls. Two buckets are
+tracked: requests per minute and (estimated) tokens per minute. A call only
+waits when one of the budgets is actually exhausted, instead of sleeping a
+fixed amount after every request.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate for a prompt or response (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """
+    Token bucket that refills continuously at ``rate_per_minute``.
+
+    Reservations are deducted immediately and may drive the balance negative;
+    the caller then waits until the bucket has refilled back to zero. This keeps
+    concurrent callers strictly ordered without holding the lock while waiting.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be > 0")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self.balance = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.balance = min(self.capacity, self.balance + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Deduct ``amount`` and return the seconds to wait before using it."""
+        self._refill(now)
+        self.balance -= amount
+        return 0.0 if self.balance >= 0 else -self.balance / self.rate
+
+    def adjust(self, amount: float, now: float) -> None:
+        """Correct a previous reservation by ``amount`` (positive = consume more)."""
+        self._refill(now)
+        self.balance -= amount
+
+
+class RateLimiter:
+    """
+    Combined requests/min and tokens/min limiter shared by sync and async callers.
+
+    Args:
+        requests_per_minute: Request budget per minute (None or 0 disables it)
+        tokens_per_minute: Token budget per minute (None or 0 disables it)
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None):
+        self._lock = threading.Lock()
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    def reserve(self, tokens: int) -> float:
+        """Reserve one request plus ``tokens`` and return the required wait in seconds."""
+        now = time.monotonic()
+        wait = 0.0
+        with self._lock:
+            if self.requests:
+                wait = max(wait, self.requests.reserve(1, now))
+            if self.tokens:
+                wait = max(wait, self.tokens.reserve(tokens, now))
+        return wait
+
+    def acquire(self, tokens: int) -> float:
+        """Block until the budget allows the call; returns the time waited."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            print(f"[info] Rate limiter: waiting {wait:.2f}s for quota")
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: int) -> float:
+        """Asyncio counterpart of :meth:`acquire`."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            print(f"[info] Rate limiter: waiting {wait:.2f}s for quota")
+            await asyncio.sleep(wait)
+        return wait
+
+    def record_usage(self, estimated: int, actual: int) -> None:
+        """Charge the difference between estimated and actual token usage."""
+        if self.tokens and actual != estimated:
+            with self._lock:
+                self.tokens.adjust(actual - estimated, time.monotonic())
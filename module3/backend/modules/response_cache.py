@@ -0,0 +1,169 @@
+"""
+Response Cache Module
+
+Content-addressed on-disk cache for model responses. Entries are keyed by a
+hash of (endpoint, prompt text, temperature, model config) and stored in a
+SQLite file with a total size cap, LRU eviction and a TTL, so reruns of the
+same statement and retries after a crash skip the network. Lookups are also
+counted on the CacheTally active in the caller's context, so each run can
+report its own hit rate while others share the cache.
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+
+class CacheTally:
+    """Hit/miss counts of the cache lookups made within one run."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the counts and the hit rate of this tally."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_current_tally: contextvars.ContextVar[Optional[CacheTally]] = contextvars.ContextVar("cache_tally", default=None)
+
+
+@contextmanager
+def use_cache_tally(tally: Optional[CacheTally]) -> Iterator[Optional[CacheTally]]:
+    """Count the cache lookups made in the ``with`` block on ``tally``."""
+    token = _current_tally.set(tally)
+    try:
+        yield tally
+    finally:
+        _current_tally.reset(token)
+
+
+class ResponseCache:
+    """
+    SQLite-backed LRU cache of raw model responses.
+
+    Args:
+        path: Database file path (parent directories are created)
+        max_bytes: Maximum total size of cached responses before LRU eviction
+        ttl_seconds: Entries older than this are treated as misses and removed
+    """
+
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: float = 7 * 24 * 3600):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(endpoint: str, prompt: str, temperature: Optional[float], model_config: Dict[str, Any]) -> str:
+        """Return the content hash identifying a model request."""
+        material = json.dumps(
+            [endpoint, prompt, temperature, model_config], sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for ``key`` or None on a miss."""
+        now = time.time()
+        tally = _current_tally.get()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                if tally is not None:
+                    tally.record(False)
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            if tally is not None:
+                tally.record(True)
+            return row[0]
+
+    def delete(self, key: str) -> None:
+        """Remove the entry for ``key`` if present."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def put(self, key: str, value: str) -> None:
+        """Store a response and evict least recently used entries over the size cap."""
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                rows = self._conn.execute(
+                    "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+                ).fetchall()
+                evict = []
+                for old_key, old_size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    evict.append((old_key,))
+                    total -= old_size
+                self._conn.executemany("DELETE FROM responses WHERE key = ?", evict)
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters plus current entry count and size."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": entries,
+                "bytes": size,
+            }
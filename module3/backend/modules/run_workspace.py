@@ -0,0 +1,117 @@
+"""
+Run Workspace Module
+
+Gives every pipeline run its own working directory for input.json,
+output.json and final_output/, so concurrent or back-to-back runs never
+overwrite each other's files. Old run directories are removed by age and by
+total disk usage.
+"""
+
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import Any, Dict, Iterable, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS_DIR = os.path.join(BACKEND_DIR, "runs")
+
+# Retention defaults: one day and 512 MB across all run directories
+DEFAULT_MAX_AGE_SECONDS = 24 * 3600
+DEFAULT_MAX_TOTAL_BYTES = 512 * 1024 * 1024
+
+
+class RunWorkspace:
+    """Paths of a single run's isolated working directory."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.run_id = os.path.basename(root)
+        self.input_path = os.path.join(root, "input.json")
+        self.output_path = os.path.join(root, "output.json")
+        self.final_output_dir = os.path.join(root, "final_output")
+
+
+def create_run_workspace(
+    run_id: Optional[str] = None,
+    input_data: Optional[Dict[str, Any]] = None,
+    input_source: Optional[str] = None,
+    runs_dir: str = RUNS_DIR
+) -> RunWorkspace:
+    """
+    Create a run-scoped directory and seed its input.json.
+
+    Args:
+        run_id: Directory name (a random ID is generated when omitted)
+        input_data: Input object to write as input.json
+        input_source: Existing input.json to copy when input_data is not given
+
+    Returns:
+        RunWorkspace for the new directory
+    """
+    workspace = RunWorkspace(os.path.join(runs_dir, run_id or uuid.uuid4().hex[:12]))
+    os.makedirs(workspace.final_output_dir, exist_ok=True)
+    if input_data is not None:
+        with open(workspace.input_path, "w", encoding="utf-8") as f:
+            json.dump(input_data, f, ensure_ascii=False, indent=2)
+    elif input_source is not None:
+        shutil.copyfile(input_source, workspace.input_path)
+    return workspace
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def cleanup_runs(
+    runs_dir: str = RUNS_DIR,
+    max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+    max_total_bytes: int = DEFAULT_MAX_TOTAL_BYTES,
+    keep: Iterable[str] = ()
+) -> int:
+    """
+    Remove run directories older than max_age_seconds, then the oldest ones
+    until the total size fits in max_total_bytes.
+
+    Args:
+        runs_dir: Directory holding the run directories
+        max_age_seconds: Maximum age (by modification time) of a run directory
+        max_total_bytes: Disk budget for all run directories together
+        keep: Run IDs that must not be removed (e.g. runs still in progress)
+
+    Returns:
+        Number of run directories removed
+    """
+    if not os.path.isdir(runs_dir):
+        return 0
+    keep = set(keep)
+    now = time.time()
+    runs = []
+    for name in os.listdir(runs_dir):
+        path = os.path.join(runs_dir, name)
+        if os.path.isdir(path) and name not in keep:
+            runs.append((os.path.getmtime(path), _dir_size(path), path))
+    runs.sort()  # oldest first
+
+    total = sum(size for _, size, _ in runs) + sum(
+        _dir_size(os.path.join(runs_dir, name)) for name in keep
+        if os.path.isdir(os.path.join(runs_dir, name))
+    )
+    removed = 0
+    for mtime, size, path in runs:
+        if now - mtime <= max_age_seconds and total <= max_total_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        removed += 1
+    if removed:
+        print(f"[info] Removed {removed} old run directories from {runs_dir}")
+    return removed
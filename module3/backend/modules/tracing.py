@@ -0,0 +1,131 @@
+"""
+Tracing Module
+
+Lightweight spans for a single pipeline run, exportable as Chrome/Perfetto
+trace-event JSON. The active tracer travels in a context variable, so spans
+opened anywhere below ``use_tracer`` are recorded against that run, and
+``submit_in_context`` carries it into thread pool workers. Without an
+active tracer, ``span`` is a no-op.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+_current_tracer: contextvars.ContextVar[Optional["Tracer"]] = contextvars.ContextVar("tracer", default=None)
+
+
+class Span:
+    """An open span; ``set`` attaches arguments shown in the trace viewer."""
+
+    __slots__ = ("name", "start", "args")
+
+    def __init__(self, name: str, start: float, args: Dict[str, Any]):
+        self.name = name
+        self.start = start
+        self.args = args
+
+    def set(self, **args: Any) -> None:
+        self.args.update(args)
+
+
+class _NoopSpan:
+    def set(self, **args: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Collects completed spans of one run as Chrome trace "complete" events.
+
+    Args:
+        name: Process name shown in the trace viewer
+        max_events: Spans beyond this count are dropped to bound memory
+    """
+
+    def __init__(self, name: str = "pipeline", max_events: int = 50000):
+        self.name = name
+        self.max_events = max_events
+        self.origin = time.perf_counter()
+        self.dropped = 0
+        self._events: List[Dict[str, Any]] = []
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def _us(self, t: float) -> float:
+        return round((t - self.origin) * 1e6, 1)
+
+    def record(self, name: str, start: float, end: float, args: Optional[Dict[str, Any]] = None) -> None:
+        """Record a span that ran from ``start`` to ``end`` (perf_counter seconds)."""
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": self._us(start),
+            "dur": round((end - start) * 1e6, 1),
+            "pid": 1,
+            "tid": thread.ident,
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            if len(self._events) >= self.max_events:
+                self.dropped += 1
+                return
+            self._events.append(event)
+            self._threads.setdefault(thread.ident, thread.name)
+
+    def to_chrome(self) -> Dict[str, Any]:
+        """Return the trace as a Chrome trace-event JSON object."""
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        metadata = [{"name": "process_name", "ph": "M", "pid": 1, "args": {"name": self.name}}]
+        metadata.extend(
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        )
+        return {
+            "traceEvents": metadata + events,
+            "displayTimeUnit": "ms",
+            "otherData": {"dropped_events": self.dropped},
+        }
+
+
+def current_tracer() -> Optional[Tracer]:
+    """Return the tracer active in this context, if any."""
+    return _current_tracer.get()
+
+
+@contextmanager
+def use_tracer(tracer: Optional[Tracer]) -> Iterator[Optional[Tracer]]:
+    """Make ``tracer`` the active tracer for the ``with`` block."""
+    token = _current_tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current_tracer.reset(token)
+
+
+@contextmanager
+def span(name: str, **args: Any) -> Iterator[Any]:
+    """Record the ``with`` block as a span on the active tracer."""
+    tracer = _current_tracer.get()
+    if tracer is None:
+        yield _NOOP_SPAN
+        return
+    opened = Span(name, time.perf_counter(), args)
+    try:
+        yield opened
+    finally:
+        tracer.record(name, opened.start, time.perf_counter(), opened.args)
+
+
+def submit_in_context(pool, fn: Callable[..., Any], *args: Any, **kwargs: Any):
+    """Submit ``fn`` to an executor so it runs with a copy of the caller's context."""
+    return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
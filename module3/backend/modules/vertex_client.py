@@ -2,16 +2,37 @@
 Vertex AI Client Module
 
 Handles Vertex AI endpoint validation, client initialization, and model calls
-with rate limiting and retry logic. Uses config.json for model parameters.
+(sync and asyncio) with token-bucket rate limiting and retry logic. Uses
+config.json for model parameters and rate limits.
 """
 
+import asyncio
 import json
 import os
 import re
+import threading
 import time
-from typing import Optional, Tuple, List, Dict, Any
-from google import genai
-from google.genai import types
+from typing import TYPE_CHECKING, Callable, Optional, Tuple, List, Dict, Any
+
+from modules.import_timing import lazy_import
+from modules.rate_limiter import RateLimiter, estimate_tokens
+from modules.response_cache import ResponseCache
+from modules.json_utils import parse_model_output
+from modules.metrics import METRICS
+from modules.tracing import span
+
+if TYPE_CHECKING:
+    from google import genai
+    from google.genai import types
+
+
+def _genai():
+    # google-genai takes a noticeable share of startup time; load it on first use
+    return lazy_import("google.genai")
+
+
+def _types():
+    return lazy_import("google.genai.types")
 
 
 # Vertex endpoint pattern validation
@@ -20,9 +41,64 @@ ENDPOINT_REGEX = re.compile(
 )
 
 
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.json')
+
+# Minimum seconds between mtime checks of config.json on the hot path
+CONFIG_CHECK_INTERVAL = 1.0
+
+_config_lock = threading.Lock()
+_config_cache: Dict[str, Any] = {"data": None, "mtime": None, "checked_at": 0.0}
+_generation_configs: Dict[Tuple, Any] = {}
+_cache_stats = {
+    "config_hits": 0,
+    "config_misses": 0,
+    "generation_config_hits": 0,
+    "generation_config_misses": 0,
+}
+
+
+def _config_mtime(config_path: str) -> Optional[int]:
+    try:
+        return os.stat(config_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
 def load_config() -> Dict[str, Any]:
+    """
+    Return configuration from config.json, cached until the file's mtime changes.
+    
+    The file is stat-ed at most once per CONFIG_CHECK_INTERVAL seconds and only
+    re-parsed when it was modified. The returned dict is shared; treat it as
+    read-only.
+    """
+    now = time.monotonic()
+    with _config_lock:
+        if _config_cache["data"] is not None:
+            if now - _config_cache["checked_at"] < CONFIG_CHECK_INTERVAL:
+                _cache_stats["config_hits"] += 1
+                return _config_cache["data"]
+            _config_cache["checked_at"] = now
+            if _config_mtime(CONFIG_PATH) == _config_cache["mtime"]:
+                _cache_stats["config_hits"] += 1
+                return _config_cache["data"]
+
+        _cache_stats["config_misses"] += 1
+        mtime = _config_mtime(CONFIG_PATH)
+        data = _read_config(CONFIG_PATH)
+        _config_cache.update(data=data, mtime=mtime, checked_at=now)
+        _generation_configs.clear()
+        return data
+
+
+def cache_stats() -> Dict[str, int]:
+    """Return hit/miss counters for the config and generation-config caches."""
+    with _config_lock:
+        return dict(_cache_stats)
+
+
+def _read_config(config_path: str) -> Dict[str, Any]:
     """Load configuration from config.json file."""
-    config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.json')
     try:
         with open(config_path, 'r', encoding='utf-8') as f:
             config = json.load(f)
@@ -49,6 +125,10 @@ def load_config() -> Dict[str, Any]:
                 "candidate_count": 1,
                 "stop_sequences": [],
                 "response_mime_type": "application/json"
+            },
+            "rate_limit": {
+                "requests_per_minute": 60,
+                "tokens_per_minute": 200000
             }
         }
     except json.JSONDecodeError as e:
@@ -64,57 +144,148 @@ def parse_endpoint_path(model: str) -> Optional[Tuple[str, str]]:
     return m.group("project"), m.group("location")
 
 
-def build_client(endpoint: str) -> genai.Client:
-    """Build and return a Vertex AI client for the given endpoint."""
+# Process-wide clients keyed by (project, location); each keeps its HTTP
+# connection pool and refreshes its credentials on demand when they expire
+_client_pool: Dict[Tuple[str, str], Any] = {}
+_client_pool_lock = threading.Lock()
+_client_pool_stats = {"hits": 0, "misses": 0, "discarded": 0}
+
+
+def build_client(endpoint: str) -> "genai.Client":
+    """
+    Return the pooled Vertex AI client for the endpoint's project and location.
+    
+    The first call for a (project, location) creates the client; later runs
+    reuse it, keeping open connections, TLS sessions and cached auth tokens.
+    """
     parsed = parse_endpoint_path(endpoint)
     if not parsed:
         raise ValueError(
             "Endpoint must match pattern projects/<project>/locations/<region>/endpoints/<id>."
         )
+    with _client_pool_lock:
+        client = _client_pool.get(parsed)
+        if client is not None:
+            _client_pool_stats["hits"] += 1
+            return client
+        _client_pool_stats["misses"] += 1
+    
     project, location = parsed
+    client = _genai().Client(vertexai=True, project=project, location=location)
     print(f"[info] Connected to Vertex AI")
-    return genai.Client(vertexai=True, project=project, location=location)
+    with _client_pool_lock:
+        # Another thread may have created one meanwhile; keep a single client per key
+        return _client_pool.setdefault(parsed, client)
 
 
-def call_model(
-    client: genai.Client, 
-    endpoint: str, 
-    user_text: str, 
-    temperature: Optional[float] = None, 
-    delay_after: float = 2.0
-) -> str:
-    """
-    Call the model with retry logic and rate limiting using config.json settings.
-    
-    Args:
-        client: Initialized Vertex AI client
-        endpoint: Vertex endpoint path
-        user_text: Prompt text to send to model
-        temperature: Sampling temperature (overrides config if provided)
-        delay_after: Delay in seconds after successful call
-        
-    Returns:
-        Generated text response from model
-        
-    Raises:
-        Exception: If all retries are exhausted or non-rate-limit errors occur
-    """
-    # Load configuration
+def discard_client(client: "genai.Client") -> None:
+    """Drop a client from the pool (e.g. after an auth failure) so the next build creates a fresh one."""
+    with _client_pool_lock:
+        for key, pooled in list(_client_pool.items()):
+            if pooled is client:
+                del _client_pool[key]
+                _client_pool_stats["discarded"] += 1
+
+
+def client_pool_stats() -> Dict[str, Any]:
+    """Return pool hit/miss counters and the (project, location) keys currently pooled."""
+    with _client_pool_lock:
+        return {
+            **_client_pool_stats,
+            "clients": len(_client_pool),
+            "keys": [f"{project}/{location}" for project, location in _client_pool],
+        }
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_limits: Optional[Dict[str, Any]] = None
+_rate_limiter_lock = threading.Lock()
+_NO_RATE_LIMIT: Dict[str, Any] = {}
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide rate limiter configured from config.json."""
+    global _rate_limiter, _rate_limiter_limits
+    limits = load_config().get("rate_limit") or _NO_RATE_LIMIT
+    if _rate_limiter is None or limits is not _rate_limiter_limits:
+        with _rate_limiter_lock:
+            if _rate_limiter is None or limits is not _rate_limiter_limits:
+                _rate_limiter_limits = limits
+                _rate_limiter = RateLimiter(
+                    requests_per_minute=limits.get("requests_per_minute"),
+                    tokens_per_minute=limits.get("tokens_per_minute"),
+                )
+    return _rate_limiter
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the process-wide response cache, or None if disabled in config.json."""
+    global _response_cache
+    settings = load_config().get("response_cache", {})
+    if not settings.get("enabled", False):
+        return None
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                path = settings.get("path", ".cache/responses.sqlite3")
+                if not os.path.isabs(path):
+                    path = os.path.join(os.path.dirname(CONFIG_PATH), path)
+                _response_cache = ResponseCache(
+                    path,
+                    max_bytes=int(settings.get("max_bytes", 64 * 1024 * 1024)),
+                    ttl_seconds=float(settings.get("ttl_seconds", 7 * 24 * 3600)),
+                )
+    return _response_cache
+
+
+def _parses(text: str) -> bool:
+    """Whether a response parses as perspective JSON; only those are cached or replayed."""
+    try:
+        parse_model_output(text)
+        return True
+    except ValueError:
+        return False
+
+
+def _cache_key(endpoint: str, user_text: str, temperature: Optional[float]) -> str:
+    return ResponseCache.make_key(endpoint, user_text, temperature, load_config().get("model_config", {}))
+
+
+def _is_rate_limit_error(e: Exception) -> bool:
+    return "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e)
+
+
+def _is_auth_error(e: Exception) -> bool:
+    message = str(e)
+    return "401" in message or "UNAUTHENTICATED" in message or "RefreshError" in type(e).__name__
+
+
+def _generation_config(temperature: Optional[float]) -> "types.GenerateContentConfig":
+    """Return a GenerateContentConfig memoized per (temperature, model params, safety)."""
     config_data = load_config()
     model_config = config_data.get("model_config", {})
     safety_config = config_data.get("safety_settings", {})
     
     # Use provided temperature or fall back to config
     final_temperature = temperature if temperature is not None else model_config.get("temperature", 0.6)
+    top_p = model_config.get("top_p", 0.9)
+    max_output_tokens = model_config.get("max_output_tokens", 8192)
+    top_k = model_config.get("top_k", 40)
+    key = (final_temperature, top_p, max_output_tokens, top_k, tuple(sorted(safety_config.items())))
     
-    try:
-        part = types.Part.from_text(text=user_text)
-    except TypeError:
-        part = types.Part(text=user_text)
-        
-    contents = [types.Content(role="user", parts=[part])]
+    with _config_lock:
+        config = _generation_configs.get(key)
+        if config is not None:
+            _cache_stats["generation_config_hits"] += 1
+            return config
+        _cache_stats["generation_config_misses"] += 1
     
     # Build safety settings from config
+    types = _types()
     safety_settings = []
     for category, threshold in safety_config.items():
         # Convert threshold values
@@ -125,42 +296,262 @@ def call_model(
     
     config = types.GenerateContentConfig(
         temperature=final_temperature,
-        top_p=model_config.get("top_p", 0.9),
-        max_output_tokens=model_config.get("max_output_tokens", 8192),
-        top_k=model_config.get("top_k", 40),
+        top_p=top_p,
+        max_output_tokens=max_output_tokens,
+        top_k=top_k,
         safety_settings=safety_settings,
         thinking_config=types.ThinkingConfig(thinking_budget=0),
     )
-    
+    with _config_lock:
+        return _generation_configs.setdefault(key, config)
+
+
+def _build_request(user_text: str, temperature: Optional[float]):
+    """Build (contents, GenerateContentConfig) for a prompt using config.json settings."""
+    types = _types()
+    try:
+        part = types.Part.from_text(text=user_text)
+    except TypeError:
+        part = types.Part(text=user_text)
+        
+    contents = [types.Content(role="user", parts=[part])]
+    return contents, _generation_config(temperature)
+
+
+class _ModelCall:
+    """
+    State of one model call and the steps call_model and call_model_async
+    share: cache lookup and store, request building, chunk handling, retry
+    classification and metrics. Only the streaming loop and the waiting differ.
+    """
+
     max_retries = 5
     base_delay = 1.0
+
+    def __init__(self, client, endpoint, user_text, temperature, use_cache, on_chunk, color, call_span):
+        self.client = client
+        self.endpoint = endpoint
+        self.user_text = user_text
+        self.temperature = temperature
+        self.use_cache = use_cache
+        self.on_chunk = on_chunk
+        self.label = color or "none"
+        self.call_span = call_span
+        self.started = time.perf_counter()
+        self.cache: Optional[ResponseCache] = None
+        self.cache_key: Optional[str] = None
+        self.streamed = False
+        self.first_chunk = False
+        self.text_chunks: List[str] = []
+
+    def lookup(self) -> Optional[str]:
+        """Return the cached response, if any; one that does not parse is evicted (blocking I/O)."""
+        self.cache = get_response_cache() if self.use_cache else None
+        if self.cache is None:
+            return None
+        self.cache_key = _cache_key(self.endpoint, self.user_text, self.temperature)
+        cached = self.cache.get(self.cache_key)
+        if cached is not None and not _parses(cached):
+            # Never replay a truncated or malformed response
+            self.cache.delete(self.cache_key)
+            cached = None
+        return cached
+
+    def replay(self, cached: str) -> str:
+        """Deliver a cached response as the call's result."""
+        self.call_span.set(cache_hit=True)
+        print(f"[info] Response cache hit")
+        METRICS.inc("model_cache_hits_total", color=self.label)
+        if self.on_chunk:
+            self.on_chunk(cached)
+        return cached
+
+    def prepare(self) -> None:
+        """Build the request and pick up the rate limiter (reads config.json)."""
+        self.contents, self.config = _build_request(self.user_text, self.temperature)
+        self.limiter = get_rate_limiter()
+        self.estimated_tokens = estimate_tokens(self.user_text)
+
+    def begin_attempt(self, attempt: int) -> None:
+        self.call_span.set(attempts=attempt + 1)
+        self.request_started = time.perf_counter()
+        self.text_chunks = []
+        print(f"[info] Generating batch...")
+
+    def receive(self, chunk) -> None:
+        """Handle one streamed chunk."""
+        if hasattr(chunk, "text") and chunk.text:
+            if not self.first_chunk:
+                self.first_chunk = True
+                ttfc_ms = (time.perf_counter() - self.request_started) * 1000
+                self.call_span.set(time_to_first_chunk_ms=round(ttfc_ms, 1))
+            self.text_chunks.append(chunk.text)
+            METRICS.inc("model_stream_bytes_total", len(chunk.text.encode("utf-8")), color=self.label)
+            if self.on_chunk:
+                self.streamed = True
+                self.on_chunk(chunk.text)
+
+    def finish(self) -> str:
+        """Return the full response text and record its token usage and duration."""
+        text = "".join(self.text_chunks)
+        self.limiter.record_usage(self.estimated_tokens, self.estimated_tokens + estimate_tokens(text))
+        METRICS.observe("model_call_seconds", time.perf_counter() - self.started, color=self.label)
+        return text
+
+    def store(self, text: str) -> None:
+        """Cache a response that parses (blocking I/O)."""
+        if self.cache is not None and text and _parses(text):
+            self.cache.put(self.cache_key, text)
+
+    def backoff(self, e: Exception, attempt: int) -> Optional[float]:
+        """Return the delay before retrying after ``e``, or None if it must be re-raised."""
+        if _is_rate_limit_error(e) and not self.streamed:
+            METRICS.inc("model_rate_limited_total", color=self.label)
+            if attempt < self.max_retries - 1:
+                METRICS.inc("model_call_retries_total", color=self.label, reason="rate_limit")
+                delay = self.base_delay * (2 ** attempt)  # Exponential backoff
+                print(f"[warn] Rate limit hit, retrying in {delay}s (attempt {attempt + 1}/{self.max_retries})")
+                return delay
+            print(f"[error] Max retries exceeded for rate limiting: {e}")
+            return None
+        print(f"[error] API call failed: {e}")
+        if _is_auth_error(e):
+            discard_client(self.client)
+        return None
+
+
+def call_model(
+    client: "genai.Client", 
+    endpoint: str, 
+    user_text: str, 
+    temperature: Optional[float] = None, 
+    delay_after: float = 0.0,
+    use_cache: bool = True,
+    on_chunk: Optional[Callable[[str], None]] = None,
+    color: Optional[str] = None
+) -> str:
+    """
+    Call the model with retry logic and rate limiting using config.json settings.
     
-    for attempt in range(max_retries):
-        try:
-            print(f"[info] Generating batch...")
-            text_chunks: List[str] = []
-            for chunk in client.models.generate_content_stream(
-                model=endpoint, contents=contents, config=config
-            ):
-                if hasattr(chunk, "text") and chunk.text:
-                    text_chunks.append(chunk.text)
-            
-            # Add delay after successful call to avoid rate limiting
-            if delay_after > 0:
-                time.sleep(delay_after)
+    Calls are paced by the process-wide token-bucket limiter (see
+    ``rate_limit`` in config.json) and only wait when the budget is exhausted.
+    Identical requests are answered from the response cache when it is enabled;
+    only responses that parse as perspective JSON are cached.
+    
+    Args:
+        client: Initialized Vertex AI client
+        endpoint: Vertex endpoint path
+        user_text: Prompt text to send to model
+        temperature: Sampling temperature (overrides config if provided)
+        delay_after: Optional extra delay in seconds after a successful call
+        use_cache: Set to False to bypass the response cache
+        on_chunk: Called with each streamed text chunk (once with the full
+            text on a cache hit). Rate-limit retries are only attempted while
+            no chunk has been delivered yet.
+        color: Color group the call belongs to, used as the metrics label
+        
+    Returns:
+        Generated text response from model
+        
+    Raises:
+        Exception: If all retries are exhausted or non-rate-limit errors occur
+    """
+    with span("call_model", color=color or "none") as call_span:
+        call = _ModelCall(client, endpoint, user_text, temperature, use_cache, on_chunk, color, call_span)
+        cached = call.lookup()
+        if cached is not None:
+            return call.replay(cached)
+        call.prepare()
+        
+        for attempt in range(call.max_retries):
+            try:
+                with span("rate_limit.acquire", tokens=call.estimated_tokens):
+                    call.limiter.acquire(call.estimated_tokens)
+                call.begin_attempt(attempt)
+                for chunk in client.models.generate_content_stream(
+                    model=endpoint, contents=call.contents, config=call.config
+                ):
+                    call.receive(chunk)
+                text = call.finish()
+                call.store(text)
+                
+                if delay_after > 0:
+                    time.sleep(delay_after)
+                    
+                return text
                 
-            return "".join(text_chunks)
-            
-        except Exception as e:
-            if "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e):
-                if attempt < max_retries - 1:
-                    delay = base_delay * (2 ** attempt)  # Exponential backoff
-                    print(f"[warn] Rate limit hit, retrying in {delay}s (attempt {attempt + 1}/{max_retries})")
+            except Exception as e:
+                delay = call.backoff(e, attempt)
+                if delay is None:
+                    raise
+                with span("retry.backoff", delay=delay):
                     time.sleep(delay)
-                    continue
-                else:
-                    print(f"[error] Max retries exceeded for rate limiting: {e}")
+
+
+async def call_model_async(
+    client: "genai.Client", 
+    endpoint: str, 
+    user_text: str, 
+    temperature: Optional[float] = None, 
+    delay_after: float = 0.0,
+    use_cache: bool = True,
+    on_chunk: Optional[Callable[[str], None]] = None,
+    color: Optional[str] = None
+) -> str:
+    """
+    Asyncio counterpart of :func:`call_model` using ``client.aio``.
+    
+    Shares the process-wide rate limiter and response cache with the
+    synchronous client, so mixed sync and async callers draw from the same
+    request and token budgets. The SQLite cache and config.json reads run in
+    a worker thread so they never block the event loop.
+    
+    Args:
+        client: Initialized Vertex AI client
+        endpoint: Vertex endpoint path
+        user_text: Prompt text to send to model
+        temperature: Sampling temperature (overrides config if provided)
+        delay_after: Optional extra delay in seconds after a successful call
+        use_cache: Set to False to bypass the response cache
+        on_chunk: Called with each streamed text chunk (once with the full
+            text on a cache hit). Rate-limit retries are only attempted while
+            no chunk has been delivered yet.
+        color: Color group the call belongs to, used as the metrics label
+        
+    Returns:
+        Generated text response from model
+        
+    Raises:
+        Exception: If all retries are exhausted or non-rate-limit errors occur
+    """
+    with span("call_model", color=color or "none") as call_span:
+        call = _ModelCall(client, endpoint, user_text, temperature, use_cache, on_chunk, color, call_span)
+        cached = await asyncio.to_thread(call.lookup)
+        if cached is not None:
+            return call.replay(cached)
+        await asyncio.to_thread(call.prepare)
+        
+        for attempt in range(call.max_retries):
+            try:
+                with span("rate_limit.acquire", tokens=call.estimated_tokens):
+                    await call.limiter.acquire_async(call.estimated_tokens)
+                call.begin_attempt(attempt)
+                stream = await client.aio.models.generate_content_stream(
+                    model=endpoint, contents=call.contents, config=call.config
+                )
+                async for chunk in stream:
+                    call.receive(chunk)
+                text = call.finish()
+                await asyncio.to_thread(call.store, text)
+                
+                if delay_after > 0:
+                    await asyncio.sleep(delay_after)
+                    
+                return text
+                
+            except Exception as e:
+                delay = call.backoff(e, attempt)
+                if delay is None:
                     raise
-            else:
-                print(f"[error] API call failed: {e}")
-                raise
\ No newline at end of file
+                with span("retry.backoff", delay=delay):
+                    await asyncio.sleep(delay)
@@ -0,0 +1,64 @@
+"""
+Tests for the near-duplicate index: variants of a stored text are caught,
+while texts stating the opposite stance stay distinct. Run from
+module3/backend:
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.dedup_index import NearDuplicateIndex, negation_words
+
+REMOTE = "Remote work clearly improves productivity for most knowledge workers and should be the default."
+
+OPPOSITE_STANCES = [
+    (REMOTE, "Remote work clearly harms productivity for most knowledge workers and should not be the default."),
+    (REMOTE, "Remote work clearly improves productivity for most knowledge workers and should not be the default."),
+    (REMOTE, "Remote work clearly improves productivity for most knowledge workers and shouldn't be the default."),
+    ("Governments should invest heavily in public transit to reduce congestion and emissions.",
+     "Governments should not invest heavily in public transit to reduce congestion and emissions."),
+    ("Raising the minimum wage helps low income families without costing jobs.",
+     "Raising the minimum wage hurts low income families by costing jobs."),
+    ("Nuclear power is a safe and necessary part of a low carbon grid.",
+     "Nuclear power is an unsafe and unnecessary part of a low carbon grid."),
+]
+
+
+def test_punctuation_and_case_variants_are_duplicates():
+    index = NearDuplicateIndex()
+    index.add(REMOTE)
+    assert "remote work clearly improves productivity for most knowledge workers, and should be the default!" in index
+    assert len(index) == 1
+
+
+def test_single_word_variant_is_duplicate():
+    index = NearDuplicateIndex()
+    index.add("Governments should invest heavily in public transit to reduce congestion and emissions.")
+    assert "Governments should invest heavily in public transit to reduce congestion and emissions today." in index
+
+
+def test_opposite_stances_are_not_collapsed():
+    for stored, opposite in OPPOSITE_STANCES:
+        for seed in range(5):
+            index = NearDuplicateIndex(seed=seed)
+            index.add(stored)
+            assert opposite not in index, (stored, opposite, seed)
+
+
+def test_negation_words_counts_contractions():
+    assert negation_words("It doesn't help, and it never will.") == ("never", "not")
+    assert negation_words("Nothing but not") == ("not", "nothing")
+    assert negation_words("It helps.") == ()
+
+
+def test_copy_is_independent():
+    index = NearDuplicateIndex()
+    index.add(REMOTE)
+    clone = index.copy()
+    clone.add(OPPOSITE_STANCES[0][1])
+    assert len(index) == 1 and len(clone) == 2
+    assert OPPOSITE_STANCES[0][1] in clone and OPPOSITE_STANCES[0][1] not in index
@@ -0,0 +1,41 @@
+"""
+Tests for model output parsing: brackets inside string literals or nested
+objects never start the array, and arrays of non-objects are rejected. Run
+from module3/backend:
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.json_utils import extract_json_array, parse_model_output
+
+
+def test_bracket_inside_string_is_not_the_array():
+    raw = '{"text":"a [1] c","color":"red"}{"text":"b","color":"blue"}'
+    assert extract_json_array(raw) is None
+    assert parse_model_output(raw) == [
+        {"text": "a [1] c", "color": "red"},
+        {"text": "b", "color": "blue"},
+    ]
+
+
+def test_array_nested_in_leading_object_is_skipped():
+    raw = '{"tags":["x","y"],"color":"red"}'
+    assert extract_json_array(raw) is None
+    assert parse_model_output(raw) == [{"tags": ["x", "y"], "color": "red"}]
+
+
+def test_top_level_array_after_prose_and_fences():
+    raw = 'Here you go "as asked":\n```json\n[{"text":"see [note]","color":"red"}]\n```'
+    assert parse_model_output(raw) == [{"text": "see [note]", "color": "red"}]
+
+
+def test_array_of_non_objects_is_rejected():
+    with pytest.raises(ValueError):
+        parse_model_output('Scores: [1, 2, 3]')
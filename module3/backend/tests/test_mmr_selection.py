@@ -0,0 +1,80 @@
+"""
+Tests for the hashed TF-IDF vectors and MMR selection: the vectorized word
+hashing matches a plain-Python reference (including non-ASCII text and block
+boundaries), and the sparse and dense MMR paths pick the same rows. Run from
+module3/backend:
+
+    python -m pytest tests
+"""
+
+import os
+import random
+import re
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.clustering import _clustering, mmr_select, tfidf_matrix
+
+WORDS = ["remote", "work", "ÉCOLE", "naïve", "straße", "don’t", "co-op", "x_1", "42", "日本語", "a", "İstanbul"]
+PUNCTUATION = [" ", "  ", ", ", ". ", " — ", "\n", "\t", "!", "'", "\0"]
+
+
+def reference_cells(texts, dims):
+    cells = []
+    for row, text in enumerate(texts):
+        for word in re.findall(r"\w+", (text or "").lower()):
+            h = 0
+            for i, byte in enumerate(word.encode("utf-8")):
+                h = (h + byte * pow(_clustering._HASH_BASE, i, 2 ** 64)) % 2 ** 64
+            column = ((h * int(_clustering._HASH_MIX)) % 2 ** 64 >> 32) % dims
+            cells.append(row * dims + column)
+    return cells
+
+
+def random_texts(count, seed, ascii_only=False):
+    rng = random.Random(seed)
+    words = [w for w in WORDS if w.isascii()] if ascii_only else WORDS
+    texts = []
+    for _ in range(count):
+        parts = [rng.choice(PUNCTUATION) if rng.random() < 0.2 else ""]
+        for _ in range(rng.randint(0, 12)):
+            parts += [rng.choice(words), rng.choice(PUNCTUATION)]
+        texts.append("".join(parts) if rng.random() > 0.05 else None)
+    return texts
+
+
+def test_hashed_cells_match_reference():
+    for ascii_only in (True, False):
+        texts = random_texts(300, seed=1, ascii_only=ascii_only)
+        assert _clustering._hashed_cells(texts, 64).tolist() == reference_cells(texts, 64)
+
+
+def test_hashed_cells_across_blocks(monkeypatch):
+    monkeypatch.setattr(_clustering, "_HASH_BLOCK", 50)
+    texts = random_texts(200, seed=2)
+    assert _clustering._hashed_cells(texts, 97).tolist() == reference_cells(texts, 97)
+
+
+def test_hashed_cells_without_words():
+    assert _clustering._hashed_cells([], 8).tolist() == []
+    assert _clustering._hashed_cells(["", None, " ,. "], 8).tolist() == []
+
+
+def test_tfidf_rows_are_normalized():
+    X = tfidf_matrix(random_texts(200, seed=3) + [""], dims=128)
+    norms = np.linalg.norm(X.toarray(), axis=1)
+    empty = np.diff(X.indptr) == 0
+    assert np.allclose(norms[~empty], 1.0) and (norms[empty] == 0).all() and empty[-1]
+    assert all((np.diff(X.indices[a:b]) > 0).all() for a, b in zip(X.indptr[:-1], X.indptr[1:]))
+
+
+def test_sparse_and_dense_mmr_pick_the_same_rows():
+    X = tfidf_matrix(random_texts(500, seed=4), dims=64)
+    relevance = np.random.default_rng(0).random(500)
+    for diversity in (0.0, 0.3, 0.9):
+        picked = mmr_select(X, relevance, 40, diversity=diversity)
+        assert picked.tolist() == mmr_select(X.toarray(), relevance, 40, diversity=diversity).tolist()
+    assert mmr_select(X, relevance, 40, diversity=0.0).tolist() == np.argsort(-relevance, kind="stable")[:40].tolist()
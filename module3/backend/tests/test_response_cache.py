@@ -0,0 +1,51 @@
+"""
+Tests for per-run response cache accounting: lookups are counted on the
+tally of the run that made them, even when runs share one cache and fan out
+to worker threads. Run from module3/backend:
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.response_cache import CacheTally, ResponseCache, use_cache_tally
+from modules.tracing import submit_in_context
+
+
+def test_lookups_are_counted_on_the_active_tally(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"))
+    cache.put("warm", "[]")
+    tally = CacheTally()
+    with use_cache_tally(tally):
+        cache.get("warm")
+        cache.get("cold")
+        cache.get("cold")
+    cache.get("warm")
+    assert tally.stats() == {"hits": 1, "misses": 2, "hit_rate": 0.3333}
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_concurrent_runs_keep_separate_tallies(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"))
+    for i in range(20):
+        cache.put(f"warm-{i}", "[]")
+    barrier = threading.Barrier(2)
+
+    def run(prefix):
+        tally = CacheTally()
+        with use_cache_tally(tally), ThreadPoolExecutor(max_workers=4) as pool:
+            barrier.wait()
+            futures = [submit_in_context(pool, cache.get, f"{prefix}-{i}") for i in range(20)]
+            for future in futures:
+                future.result()
+        return tally.stats()
+
+    with ThreadPoolExecutor(max_workers=2) as runs:
+        warm, cold = runs.submit(run, "warm"), runs.submit(run, "cold")
+        assert warm.result() == {"hits": 20, "misses": 0, "hit_rate": 1.0}
+        assert cold.result() == {"hits": 0, "misses": 20, "hit_rate": 0.0}
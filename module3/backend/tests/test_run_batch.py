@@ -0,0 +1,60 @@
+"""
+Tests for run_batch through modules.clustering, including worker processes
+started with spawn (the default on Windows and macOS). Run from
+module3/backend:
+
+    python -m pytest tests
+"""
+
+import json
+import multiprocessing
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.clustering import run_batch
+
+
+def write_outputs(root, count):
+    rng = random.Random(0)
+    files = []
+    for t in range(count):
+        path = root / f"topic{t}" / "output.json"
+        path.parent.mkdir(parents=True)
+        perspectives = [{"bias_x": rng.random(), "significance_y": rng.random(), "text": f"t{i}"} for i in range(40)]
+        path.write_text(json.dumps({"input": f"topic {t}", "perspectives": perspectives}), encoding="utf-8")
+        files.append(str(path))
+    return files
+
+
+@pytest.fixture(params=["fork", "spawn"])
+def start_method(request):
+    if request.param not in multiprocessing.get_all_start_methods():
+        pytest.skip(f"{request.param} is not available on this platform")
+    previous = multiprocessing.get_start_method(allow_none=True)
+    multiprocessing.set_start_method(request.param, force=True)
+    yield request.param
+    multiprocessing.set_start_method(previous, force=True)
+
+
+def test_run_batch_in_worker_processes(tmp_path, start_method):
+    files = write_outputs(tmp_path / "in", 3)
+    index = run_batch(files, str(tmp_path / "out"), workers=2)
+    assert index["succeeded"] == 3 and index["failed"] == 0
+    for entry in index["topics"]:
+        assert entry["leftist"] + entry["rightist"] + entry["common"] == 21
+        assert os.path.exists(os.path.join(entry["output_dir"], "common.json"))
+
+
+def test_run_batch_reports_unreadable_files(tmp_path):
+    files = write_outputs(tmp_path / "in", 1)
+    broken = tmp_path / "in" / "broken" / "output.json"
+    broken.parent.mkdir()
+    broken.write_text("{not json", encoding="utf-8")
+    index = run_batch(files + [str(broken)], str(tmp_path / "out"), workers=1)
+    assert index["succeeded"] == 1 and index["failed"] == 1
+    assert index["topics"][1]["error"].startswith("JSONDecodeError")
@@ -0,0 +1,84 @@
+"""
+Tests that the batch stratified selection (stratified_selection_batch and its
+array core) picks exactly what stratified_selection_and_distribution picks per
+topic, including ties, boundary and NaN biases and missing bias_x. Run from
+module3/backend:
+
+    python -m pytest tests
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.clustering import (
+    stratified_selection_and_distribution, stratified_selection_batch, stratified_selection_indices
+)
+
+SIZES = [0, 1, 5, 7, 10, 14, 15, 20, 28, 29, 50, 77, 78, 100, 136, 137, 200]
+
+
+def random_topics(count, seed=3):
+    """Topics spanning every target size range; half use a coarse grid so ties and thresholds are common."""
+    rng = random.Random(seed)
+    topics = []
+    for _ in range(count):
+        grid = rng.random() < 0.5
+        perspectives = []
+        for i in range(rng.choice(SIZES)):
+            if grid:
+                bias = rng.choice([0.428, 0.571, 0.0, 1.0, 0.5, float("nan"), rng.random()])
+                significance = rng.choice([0.1, 0.5, 0.5, 0.9])
+            else:
+                bias, significance = rng.random(), round(rng.random(), 2)
+            p = {"bias_x": bias, "significance_y": significance, "i": i}
+            if rng.random() < 0.02:
+                del p["bias_x"]
+            perspectives.append(p)
+        topics.append(perspectives)
+    return topics
+
+
+def ids(selection):
+    return [[p["i"] for p in group] for group in selection]
+
+
+def per_topic(topics):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return [ids(stratified_selection_and_distribution(perspectives)) for perspectives in topics]
+
+
+def test_batch_matches_per_topic_selection():
+    topics = random_topics(3000)
+    assert [ids(result) for result in stratified_selection_batch(topics)] == per_topic(topics)
+
+
+def test_verbose_batch_prints_the_per_topic_messages():
+    for perspectives in random_topics(200, seed=5):
+        single, batch = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(single):
+            stratified_selection_and_distribution(perspectives)
+        with contextlib.redirect_stdout(batch):
+            stratified_selection_batch([perspectives], verbose=True)
+        assert batch.getvalue() == single.getvalue()
+
+
+def test_array_core_matches_per_topic_selection():
+    topics = random_topics(500, seed=7)
+    flat = [p for perspectives in topics for p in perspectives]
+    bias = np.array([p.get("bias_x", 0.5) for p in flat])
+    significance = np.array([p["significance_y"] for p in flat])
+    selected, counts, slots, _ = stratified_selection_indices(bias, significance, [len(t) for t in topics])
+
+    expected = per_topic(topics)
+    picked = [flat[i] for i in selected.tolist()]
+    bounds = np.concatenate(([0], np.cumsum(np.minimum(slots, counts).ravel()))).tolist()
+    for t, (left, right, common) in enumerate(expected):
+        groups = [[p["i"] for p in picked[bounds[3 * t + b]:bounds[3 * t + b + 1]]] for b in range(3)]
+        assert groups == [left, common, right]
@@ -1,10 +1,79 @@
-import subprocess, json, time, threading, asyncio, importlib.util
+import time
+_IMPORT_STARTED = time.perf_counter()
+import json, threading, asyncio, os, queue, uuid, sys, gzip, hashlib
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from pathlib import Path
-from fastapi import FastAPI, BackgroundTasks, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+_FRAMEWORK_LOADED = time.perf_counter()
 
-app = FastAPI(title="Pipeline Orchestrator (Module3 Only)", version="0.1")
+try:
+    import brotli  # optional: adds a br variant of cached result bodies
+except ImportError:
+    brotli = None
+
+
+class LoopBridge:
+    """Hands perspective updates from worker threads to the server's event loop.
+
+    Worker threads call publish(), which schedules an asyncio.Queue put on the
+    loop with call_soon_threadsafe; a single pump task drains the queue in
+    order, broadcasts color groups to the connected WebSocket clients and hands
+    every event to the job's SSE subscribers.
+    """
+
+    def __init__(self):
+        self.loop = None
+        self.queue = None
+        self.task = None
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        self.task = self.loop.create_task(self._pump())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+        self.loop = None
+
+    def publish(self, job, event):
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self.queue.put_nowait, (job, event))
+
+    async def _pump(self):
+        while True:
+            job, event = await self.queue.get()
+            event_id, kind, data = event
+            for subscriber in list(job.sse_queues):
+                subscriber.put_nowait(event)
+            if kind != "group":
+                continue
+            try:
+                await broadcast_perspectives(job, data["color"], data["perspectives"])
+            except Exception as e:
+                print(f"Error broadcasting {data['color']} perspectives: {e}")
+
+
+BRIDGE = LoopBridge()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the thread-to-loop bridge with the server's event loop."""
+    BRIDGE.start()
+    STARTUP_TIMES["ready"] = round(time.perf_counter() - _IMPORT_STARTED, 4)
+    # Warm the pipeline imports after the server is up instead of delaying startup
+    threading.Thread(target=preload_modules, name="preload", daemon=True).start()
+    yield
+    await BRIDGE.stop()
+
+
+app = FastAPI(title="Pipeline Orchestrator (Module3 Only)", version="0.1", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,9 +85,60 @@ app.add_middleware(
 
 BASE = Path(__file__).resolve().parent
 MOD3_DIR = BASE / "module3" / "backend"  # Cache path
-PYTHON_EXE = BASE / ".venv" / "Scripts" / "python.exe"  # Cache python path
 
-STATE = {
+if str(MOD3_DIR) not in sys.path:
+    sys.path.insert(0, str(MOD3_DIR))
+from modules.run_workspace import create_run_workspace, cleanup_runs
+from modules.metrics import METRICS
+from modules.tracing import Tracer, span, use_tracer
+from modules.response_cache import CacheTally
+from modules.import_timing import lazy_import, import_times
+
+# Seconds since this module started importing, by startup phase
+_MODULES_LOADED = time.perf_counter()
+STARTUP_TIMES = {
+    "framework_imports": round(_FRAMEWORK_LOADED - _IMPORT_STARTED, 4),
+    "pipeline_modules": round(_MODULES_LOADED - _FRAMEWORK_LOADED, 4),
+}
+
+# Modules imported in the background once the server is accepting requests
+PRELOAD_MODULES = [m for m in os.environ.get(
+    "ORCHESTRATOR_PRELOAD", "main_modules.api_request,google.genai").split(",") if m.strip()]
+
+
+def load_pipeline():
+    """Return the api_request module, importing it on the first call only."""
+    return lazy_import("main_modules.api_request")
+
+# The clustering script (numpy), the chart renderer and the model client are
+# imported on first use as well, so the server starts without them
+def load_clustering():
+    return lazy_import("modules.clustering")
+
+def load_chart_render():
+    return lazy_import("modules.chart_render")
+
+def load_vertex_client():
+    return lazy_import("modules.vertex_client")
+
+
+def preload_modules():
+    for name in PRELOAD_MODULES:
+        try:
+            lazy_import(name.strip())
+        except Exception as e:
+            print(f"Preloading {name} failed: {e}")
+
+# Job manager sizing (overridable through the environment)
+WORKERS = int(os.environ.get("ORCHESTRATOR_WORKERS", "2"))
+QUEUE_SIZE = int(os.environ.get("ORCHESTRATOR_QUEUE_SIZE", "8"))
+MAX_JOBS_KEPT = int(os.environ.get("ORCHESTRATOR_MAX_JOBS", "50"))
+
+# Retention of per-run working directories under module3/backend/runs
+RUN_MAX_AGE_SECONDS = float(os.environ.get("RUN_RETENTION_SECONDS", str(24 * 3600)))
+RUN_MAX_TOTAL_BYTES = int(os.environ.get("RUN_RETENTION_MAX_BYTES", str(512 * 1024 * 1024)))
+
+IDLE_STATE = {
     "stage": "idle",
     "progress": 0,
     "error": None,
@@ -26,207 +146,523 @@ STATE = {
     "ended_at": None
 }
 
-LOCK = threading.Lock()
 
-# Store active WebSocket connections
-active_websockets = set()
+class Job:
+    """State, progress and results of a single pipeline run."""
 
-# Perspective data storage for reconnecting clients
-perspective_cache = {}
+    def __init__(self, params=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.params = params or {}
+        self.lock = threading.Lock()
+        self.state = {
+            "job_id": self.id,
+            "stage": "queued",
+            "progress": 0,
+            "error": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "ended_at": None,
+            # Response cache hits/misses of this run's model calls
+            "response_cache": None
+        }
+        # Perspective data storage for reconnecting clients
+        self.perspective_cache = {}
+        # Bumped on every cache update; cache_versions maps color -> version it last changed
+        self.cache_version = 0
+        self.cache_versions = {}
+        # (version, encoded body) of the last full /ws/cache response
+        self._cache_body = None
+        # Active WebSocket connections following this job
+        self.websockets = set()
+        # Ordered (id, kind, data) events replayed to SSE clients on reconnect
+        self.events = []
+        # asyncio.Queue per connected SSE client, fed by the loop bridge
+        self.sse_queues = set()
+        # Run-scoped working directory, created when the job starts
+        self.workspace = None
+        # Leftist/rightist/common selection, set when clustering finishes
+        self.clustering = None
+        # Compact chart spec of the selection for the frontend, see /chart
+        self.chart = None
+        # Future of the background PNG render, started by the first /chart/{id}/image
+        self.chart_image = None
+        # Encoded final output served by /results, see encode_results()
+        self.results = None
+        # Spans of this run, exported by /trace/{job_id}
+        self.tracer = Tracer(f"job {self.id}")
 
-def _set(stage=None, progress=None, error=None):
-    with LOCK:
-        if stage: STATE["stage"] = stage
-        if progress is not None: STATE["progress"] = progress
-        if error is not None: STATE["error"] = error
-        if stage == "done":
-            STATE["ended_at"] = time.time()
+    def set(self, stage=None, progress=None, error=None, response_cache=None):
+        with self.lock:
+            stage_changed = stage is not None and stage != self.state["stage"]
+            if stage: self.state["stage"] = stage
+            if progress is not None: self.state["progress"] = progress
+            if error is not None: self.state["error"] = error
+            if response_cache is not None: self.state["response_cache"] = response_cache
+            if stage == "module3" and self.state["started_at"] is None:
+                self.state["started_at"] = time.time()
+            if stage in ("done", "error"):
+                self.state["ended_at"] = time.time()
+        if stage_changed:
+            self.add_event("status", self.snapshot())
 
-def run_module3():
-    """Run module3 and handle perspective streaming."""
+    def cache_perspectives(self, color, perspectives):
+        with self.lock:
+            self.perspective_cache[color] = perspectives
+            self.cache_version += 1
+            self.cache_versions[color] = self.cache_version
+
+    def cache_delta(self, since):
+        """Return (version, encoded JSON of the colors changed after ``since``)."""
+        with self.lock:
+            version = self.cache_version
+            if since <= 0 and self._cache_body and self._cache_body[0] == version:
+                return version, self._cache_body[1]
+            delta = {color: self.perspective_cache[color]
+                     for color, changed in self.cache_versions.items() if changed > since}
+            body = json.dumps(delta, ensure_ascii=False).encode("utf-8")
+            if since <= 0:
+                # Every poller at the same version shares one serialization
+                self._cache_body = (version, body)
+            return version, body
+
+    def add_event(self, kind, data):
+        """Record an event under the next event ID and push it to live subscribers."""
+        with self.lock:
+            event = (len(self.events) + 1, kind, data)
+            self.events.append(event)
+            # Published under the lock so the loop receives events in ID order
+            BRIDGE.publish(self, event)
+        return event
+
+    def events_since(self, last_event_id):
+        # IDs are 1-based positions in the log, so the missed events are a slice
+        with self.lock:
+            return self.events[max(0, last_event_id):]
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.state)
+
+    @property
+    def finished(self):
+        return self.state["stage"] in ("done", "error")
+
+
+class JobManager:
+    """Runs jobs from a bounded queue on a fixed pool of worker threads."""
+
+    def __init__(self, workers, queue_size, max_jobs_kept):
+        self.jobs = OrderedDict()
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.max_jobs_kept = max_jobs_kept
+        self.lock = threading.Lock()
+        self.workers = [
+            threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self.workers:
+            t.start()
+
+    def submit(self, params=None):
+        """Queue a new job; raises queue.Full when the backlog is at capacity."""
+        job = Job(params)
+        with self.lock:
+            self.queue.put_nowait(job)
+            self.jobs[job.id] = job
+            self._prune()
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def latest(self):
+        with self.lock:
+            return next(reversed(self.jobs.values()), None)
+
+    def list(self):
+        with self.lock:
+            return [job.snapshot() for job in self.jobs.values()]
+
+    def active_ids(self):
+        with self.lock:
+            return [job.id for job in self.jobs.values() if not job.finished]
+
+    def _prune(self):
+        # Forget the oldest finished jobs beyond the retention limit
+        excess = len(self.jobs) - self.max_jobs_kept
+        for job_id in [j.id for j in self.jobs.values() if j.finished][:max(0, excess)]:
+            del self.jobs[job_id]
+
+    def _worker(self):
+        while True:
+            job = self.queue.get()
+            try:
+                with use_tracer(job.tracer), span("job", job_id=job.id):
+                    run_module3(job)
+            finally:
+                self.queue.task_done()
+
+
+def run_module3(job):
+    """Run module3 for a job and handle perspective streaming."""
     try:
-        STATE["started_at"] = time.time()
-        _set(stage="module3", progress=10)
-        
-        # Import necessary modules
-        import sys, importlib
-        sys.path.append(str(MOD3_DIR))
-        sys.path.append(str(MOD3_DIR / "main_modules"))
-        
-        # Import the api_request module
+        job.set(stage="module3", progress=10)
+
+        # Give the run its own input/output files and prune old runs
+        cleanup_runs(max_age_seconds=RUN_MAX_AGE_SECONDS, max_total_bytes=RUN_MAX_TOTAL_BYTES,
+                     keep=JOBS.active_ids())
+        input_data = job.params if (job.params.get("topic") or job.params.get("input")) else None
+        job.workspace = create_run_workspace(
+            job.id, input_data=input_data, input_source=str(MOD3_DIR / "input.json")
+        )
+        workspace = job.workspace
+
+        # The pipeline module is imported once per process and reused by every run
         try:
-            # Use importlib to dynamically import the module
-            api_request_spec = importlib.util.find_spec("api_request", [str(MOD3_DIR / "main_modules")])
-            if api_request_spec:
-                api_request = importlib.util.module_from_spec(api_request_spec)
-                api_request_spec.loader.exec_module(api_request)
-                print("Successfully imported api_request module")
-            else:
-                raise ImportError("Could not find api_request module")
+            api_request = load_pipeline()
         except ImportError as e:
             print(f"Error importing api_request: {e}")
-            _set(stage="error", error=f"Import error: {str(e)}")
+            job.set(stage="error", error=f"Import error: {str(e)}")
             return
-        
+
         # Define callback function for streaming perspectives
         def stream_callback(color, perspectives):
-            print(f"Received {len(perspectives)} perspectives for color {color}")
-            
-            # Update progress based on color (rough estimation)
-            color_progress = {
-                "red": 15, "orange": 30, "yellow": 45, 
-                "green": 60, "blue": 75, "indigo": 85, "violet": 95
-            }
-            _set(progress=color_progress.get(color, 50))
-            
-            # Create a global variable to store current perspectives
-            global perspective_cache
-            perspective_cache[color] = perspectives
-            
-            # We can't directly call async functions from a sync callback
-            # Instead, store the perspectives in the cache, and clients will get them
-            # when they reconnect or through polling
-            print(f"Stored {len(perspectives)} {color} perspectives in cache")
-        
+            print(f"[{job.id}] Received {len(perspectives)} perspectives for color {color}")
+
+            # Update progress by completed colors (groups finish in any order)
+            job.cache_perspectives(color, perspectives)
+            job.set(progress=min(95, 10 + 12 * len(job.perspective_cache)))
+
+            # Push to connected WebSocket and SSE clients from the event loop
+            job.add_event("group", {"color": color, "perspectives": perspectives})
+
+        # Individual perspectives as soon as they are parsed; the group event
+        # that follows is authoritative after repairs and deduplication
+        def perspective_callback(color, perspective):
+            job.add_event("perspective", {"color": color, "perspective": perspective})
+
         # Create arguments for the api_request module
         class Args:
             pass
         args = Args()
-        args.input = str(MOD3_DIR / "input.json")
-        args.output = str(MOD3_DIR / "output.json")
+        args.input = workspace.input_path
+        args.output = workspace.output_path
         args.endpoint = None
         args.model = None
         args.temperature = 0.6
+        args.concurrency = 7
+        args.repair_concurrency = 4
         args.stream_callback = stream_callback
-        
-        # Run the pipeline with streaming callback
-        code = api_request.run_pipeline(args)
-        
-        # After pipeline completes, ensure we have all colors in our cache
-        # by loading the final output file
+        args.perspective_callback = perspective_callback
+        args.cache_tally = CacheTally()
+
+        # Run the pipeline with streaming callback; output.json is written in
+        # the background and everything below works on the returned object
+        try:
+            with span("run_pipeline"):
+                full_data = api_request.run_pipeline(args)
+        finally:
+            job.set(response_cache=args.cache_tally.stats())
+        if full_data is None:
+            job.set(stage="error", error="Model client initialization failed")
+            return
+
+        # Ensure we have all colors in our cache, grouped from the final result
+        by_color = {}
+        for p in full_data["perspectives"]:
+            color = p.get("color")
+            if color:
+                by_color.setdefault(color, []).append(p)
+        for color, perspectives in by_color.items():
+            if color not in job.perspective_cache or len(job.perspective_cache[color]) < len(perspectives):
+                print(f"Updating cache with {len(perspectives)} {color} perspectives from final output")
+                job.cache_perspectives(color, perspectives)
+
+        # Select the debate agents' perspectives in-process; the chart is drawn
+        # by the frontend, so the matplotlib visualization is skipped here
+        job.set(progress=96, stage="clustering")
         try:
-            output_file = MOD3_DIR / "output.json"
-            if output_file.exists():
-                with open(output_file, 'r', encoding='utf-8') as f:
-                    full_data = json.load(f)
-                    if "perspectives" in full_data:
-                        # Group perspectives by color
-                        by_color = {}
-                        for p in full_data["perspectives"]:
-                            color = p.get("color")
-                            if color:
-                                if color not in by_color:
-                                    by_color[color] = []
-                                by_color[color].append(p)
-                        
-                        # Update our cache with the complete data
-                        for color, perspectives in by_color.items():
-                            if color not in perspective_cache or len(perspective_cache[color]) < len(perspectives):
-                                print(f"Updating cache with {len(perspectives)} {color} perspectives from output file")
-                                perspective_cache[color] = perspectives
+            with METRICS.timer("pipeline_stage_seconds", stage="clustering"), span("clustering"):
+                clustering = load_clustering()
+                job.clustering = clustering.run_clustering(
+                    full_data.get("perspectives"), output_dir=workspace.final_output_dir,
+                    topic=full_data.get("input"), mode=job.params.get("clustering_mode", "stratified"),
+                    diversity=job.params.get("diversity", 0.3)
+                )
+                job.chart = clustering.visualization_spec(
+                    job.clustering["leftist"], job.clustering["rightist"], job.clustering["common"],
+                    full_data.get("input")
+                )
+                clustering.save_chart_spec(job.chart, output_dir=workspace.final_output_dir)
         except Exception as e:
-            print(f"Error loading perspectives from output file: {e}")
-        
-        # Check if we need to run the clustering step
-        clustering_file = MOD3_DIR / "modules" / "TOP-N_K_MEANS-CLUSTERING.py"
-        if clustering_file.exists():
-            _set(progress=96, stage="clustering")
-            subprocess.run([
-                str(PYTHON_EXE),
-                str(clustering_file)
-            ], cwd=str(MOD3_DIR), check=True, timeout=60)
-        
-        _set(progress=100, stage="done")
-    except subprocess.TimeoutExpired:
-        _set(stage="error", error="Module3 execution timed out")
-    except subprocess.CalledProcessError as e:
-        _set(stage="error", error=f"Module3 failed with exit code {e.returncode}")
+            job.set(stage="error", error=f"Clustering failed: {str(e)}")
+            return
+
+        job.results = encode_results(full_data)
+        job.set(progress=100, stage="done")
     except FileNotFoundError as e:
-        _set(stage="error", error=f"File not found: {str(e)}")
+        job.set(stage="error", error=f"File not found: {str(e)}")
     except Exception as e:
-        _set(stage="error", error=f"Unexpected error: {str(e)}")
+        job.set(stage="error", error=f"Unexpected error: {str(e)}")
+
+
+JOBS = JobManager(WORKERS, QUEUE_SIZE, MAX_JOBS_KEPT)
+
+# WebSocket clients connected to the unscoped /ws/perspectives endpoint
+latest_websockets = set()
+
+
+def _job_or_404(job_id):
+    job = JOBS.get(job_id)
+    if job is None:
+        return None, JSONResponse({"error": "unknown job"}, status_code=404)
+    return job, None
+
+@app.get("/metrics")
+def get_metrics(format: str = "prometheus"):
+    if format == "json":
+        return METRICS.snapshot()
+    return Response(METRICS.render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/client-pool")
+def get_client_pool():
+    # Model clients are shared across runs per (project, location)
+    return load_vertex_client().client_pool_stats()
+
+@app.get("/startup")
+def get_startup_report():
+    # Import-time breakdown for cold-start tuning; lazy imports appear after first use
+    return {
+        "phases": STARTUP_TIMES,
+        "lazy_imports": import_times(),
+        "sys_path_entries": len(sys.path),
+    }
+
+@app.get("/trace/{job_id}")
+def get_job_trace(job_id: str):
+    # Chrome/Perfetto trace-event JSON; open in ui.perfetto.dev or chrome://tracing
+    job, error = _job_or_404(job_id)
+    return error or job.tracer.to_chrome()
 
 @app.post("/run")
-def start_run(data: dict, background: BackgroundTasks):
-    if STATE["stage"] in ("module3",):
-        return JSONResponse({"error": "pipeline already running"}, status_code=409)
-    # Clear any previously cached perspectives when initiating a new run
-    global perspective_cache
-    if perspective_cache:
-        print("Clearing existing perspective cache for new run")
-    perspective_cache = {}
-    _set(stage="queued", progress=0, error=None)
-    background.add_task(run_module3)
-    return {"status": "started"}
+def start_run(data: dict):
+    mode = data.get("clustering_mode", "stratified")
+    if mode != "stratified":
+        # Only a non-default mode needs the clustering module to be validated
+        selection_modes = load_clustering().SELECTION_MODES
+        if mode not in selection_modes:
+            return JSONResponse({"error": f"clustering_mode must be one of {', '.join(selection_modes)}"}, status_code=400)
+    diversity = data.get("diversity", 0.3)
+    if isinstance(diversity, bool) or not isinstance(diversity, (int, float)) or not 0 <= diversity <= 1:
+        return JSONResponse({"error": "diversity must be a number between 0 and 1"}, status_code=400)
+    try:
+        job = JOBS.submit(data)
+    except queue.Full:
+        return JSONResponse({"error": "job queue is full, try again later"}, status_code=503)
+    print(f"Queued job {job.id}")
+    return {"status": "started", "job_id": job.id}
+
+@app.get("/jobs")
+def list_jobs():
+    return {"jobs": JOBS.list()}
 
 @app.get("/status")
 def get_status():
     # Add cache headers for better frontend performance
     headers = {"Cache-Control": "no-cache, must-revalidate"}
-    return JSONResponse(content=STATE, headers=headers)
+    job = JOBS.latest()
+    return JSONResponse(content=job.snapshot() if job else IDLE_STATE, headers=headers)
 
-@app.get("/results")
-def get_results():
-    if STATE["stage"] != "done":
+@app.get("/status/{job_id}")
+def get_job_status(job_id: str):
+    job, error = _job_or_404(job_id)
+    if error:
+        return error
+    headers = {"Cache-Control": "no-cache, must-revalidate"}
+    return JSONResponse(content=job.snapshot(), headers=headers)
+
+def encode_results(obj):
+    """Serialize a finished result once, with compressed variants and a strong ETag.
+
+    Returns {"etag": str, "bodies": {encoding: bytes}} where encoding is
+    "identity", "gzip" and, when the brotli package is installed, "br".
+    """
+    body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+    bodies = {"identity": body, "gzip": gzip.compress(body, compresslevel=6, mtime=0)}
+    if brotli is not None:
+        bodies["br"] = brotli.compress(body)
+    return {"etag": hashlib.sha256(body).hexdigest()[:32], "bodies": bodies}
+
+def _accepted_encodings(header):
+    accepted = set()
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+def _results(request, job):
+    if job is None or job.state["stage"] != "done":
         return JSONResponse({"error": "not ready"}, status_code=400)
-    
-    out_file = MOD3_DIR / "output.json"
-    if not out_file.exists():
+    if job.results is None:
         return JSONResponse({"error": "final output missing"}, status_code=500)
-    
+
+    # Pick the smallest representation the client accepts
+    accepted = _accepted_encodings(request.headers.get("accept-encoding"))
+    bodies = job.results["bodies"]
+    encoding = next((e for e in ("br", "gzip") if e in bodies and (e in accepted or "*" in accepted)), "identity")
+
+    # Each representation has its own strong ETag; a match on any of them
+    # means the client already holds the current result
+    base = job.results["etag"]
+    etag = f'"{base}"' if encoding == "identity" else f'"{base}-{encoding}"'
+    headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    variants = {base} | {f"{base}-{e}" for e in bodies}
+    tags = _if_none_match(request)
+    if "*" in tags or tags & variants:
+        return Response(status_code=304, headers=headers)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(bodies[encoding], media_type="application/json", headers=headers)
+
+@app.get("/results")
+def get_results(request: Request):
+    return _results(request, JOBS.latest())
+
+@app.get("/results/{job_id}")
+def get_job_results(job_id: str, request: Request):
+    job, error = _job_or_404(job_id)
+    return error or _results(request, job)
+
+def _clustering(job):
+    if job is None or job.clustering is None:
+        return JSONResponse({"error": "not ready"}, status_code=400)
+    return job.clustering
+
+@app.get("/clustering")
+def get_clustering():
+    return _clustering(JOBS.latest())
+
+@app.get("/clustering/{job_id}")
+def get_job_clustering(job_id: str):
+    job, error = _job_or_404(job_id)
+    return error or _clustering(job)
+
+@app.get("/chart")
+def get_chart():
+    job = JOBS.latest()
+    if job is None or job.chart is None:
+        return JSONResponse({"error": "not ready"}, status_code=400)
+    return job.chart
+
+@app.get("/chart/{job_id}")
+def get_job_chart(job_id: str):
+    job, error = _job_or_404(job_id)
+    if error or job.chart is None:
+        return error or JSONResponse({"error": "not ready"}, status_code=400)
+    return job.chart
+
+@app.get("/chart/{job_id}/image")
+def get_job_chart_image(job_id: str):
+    """Serve the rendered chart PNG; the first request queues a background
+    render (cached by chart data) and gets 202 until the image exists."""
+    job, error = _job_or_404(job_id)
+    if error or job.chart is None:
+        return error or JSONResponse({"error": "not ready"}, status_code=400)
+    with job.lock:
+        if job.chart_image is None:
+            selection = (job.clustering["leftist"], job.clustering["rightist"], job.clustering["common"])
+            topic = job.chart["topic"]
+            create_visualization = load_clustering().create_visualization
+            job.chart_image = load_chart_render().get_renderer().submit(
+                "debate_visualization", job.chart,
+                lambda path: create_visualization(*selection, topic, output_path=path),
+                os.path.join(job.workspace.final_output_dir, "debate_visualization.png")
+            )
+        image = job.chart_image
+    if not image.done():
+        return JSONResponse({"status": "rendering"}, status_code=202, headers={"Retry-After": "1"})
+    if image.exception() is not None:
+        # Forget the failed render so the next request retries it
+        with job.lock:
+            if job.chart_image is image:
+                job.chart_image = None
+        return JSONResponse({"error": f"render failed: {image.exception()}"}, status_code=500)
+    return FileResponse(image.result(), media_type="image/png")
+
+def _if_none_match(request):
+    """Entity tags listed in If-None-Match, without W/ prefixes and quotes."""
+    tags = set()
+    for tag in request.headers.get("if-none-match", "").split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        if tag:
+            tags.add(tag)
+    return tags
+
+def _perspective_cache(request, job, since, scoped=False):
+    """Serve the perspective cache, or only the colors changed after ``since``.
+
+    ``since`` is the X-Cache-Version token of an earlier response,
+    "<job_id>:<version>"; a token from another job gets the full cache. A bare
+    version number is only accepted on the job-scoped route. The full cache
+    and each delta have their own ETag, so polling clients get a 304 until a
+    new color group arrives and the cache is never read from disk.
+    """
+    if job is None:
+        return {}
+    token_job, _, token_version = (since or "").rpartition(":")
     try:
-        # Faster file reading with explicit encoding
-        with open(out_file, 'r', encoding='utf-8') as f:
-            return json.load(f)  # Direct JSON load instead of read + parse
-    except json.JSONDecodeError:
-        return JSONResponse({"error": "invalid JSON in output file"}, status_code=500)
-    except IOError as e:
-        return JSONResponse({"error": f"file read error: {str(e)}"}, status_code=500)
+        since = max(0, int(token_version)) if token_version else 0
+    except ValueError:
+        return JSONResponse({"error": "since must be an X-Cache-Version token"}, status_code=400)
+    if token_job != job.id and not (scoped and not token_job):
+        since = 0
+
+    version = job.cache_version
+    etag = f"{job.id}-{since}-{version}" if since else f"{job.id}-{version}"
+    headers = {"ETag": f'"{etag}"', "X-Cache-Version": f"{job.id}:{version}", "Cache-Control": "no-cache"}
+    if etag in _if_none_match(request) or (since and since >= version):
+        return Response(status_code=304, headers=headers)
+
+    version, body = job.cache_delta(since)
+    headers["ETag"] = f'"{job.id}-{since}-{version}"' if since else f'"{job.id}-{version}"'
+    headers["X-Cache-Version"] = f"{job.id}:{version}"
+    return Response(body, media_type="application/json", headers=headers)
 
 @app.get("/ws/cache")
-def get_perspective_cache():
-    """Get the current perspective cache for polling clients."""
-    # Log the current cache state for debugging
-    colors = list(perspective_cache.keys())
-    color_counts = {color: len(perspectives) for color, perspectives in perspective_cache.items()}
-    print(f"Serving perspective cache: {colors} with counts: {color_counts}")
-    
-    # Check if we're done processing but missing violet
-    if "red" in perspective_cache and "orange" in perspective_cache and \
-       "yellow" in perspective_cache and "green" in perspective_cache and \
-       "blue" in perspective_cache and "indigo" in perspective_cache and \
-       "violet" not in perspective_cache and STATE["progress"] >= 90:
-        
-        # Try to load violet from output file if it exists
-        try:
-            output_file = MOD3_DIR / "output.json"
-            if output_file.exists():
-                with open(output_file, 'r', encoding='utf-8') as f:
-                    full_data = json.load(f)
-                    if "perspectives" in full_data:
-                        # Find violet perspectives
-                        violet_perspectives = [p for p in full_data["perspectives"] if p.get("color") == "violet"]
-                        if violet_perspectives:
-                            print(f"Loading {len(violet_perspectives)} violet perspectives from output file")
-                            perspective_cache["violet"] = violet_perspectives
-        except Exception as e:
-            print(f"Error loading violet perspectives from file: {e}")
-    
-    return perspective_cache
+def get_perspective_cache(request: Request, since: str = None):
+    return _perspective_cache(request, JOBS.latest(), since)
 
-@app.websocket("/ws/perspectives")
-async def perspectives_ws(websocket: WebSocket):
+@app.get("/ws/cache/{job_id}")
+def get_job_perspective_cache(job_id: str, request: Request, since: str = None):
+    job, error = _job_or_404(job_id)
+    return error or _perspective_cache(request, job, since, scoped=True)
+
+async def _perspectives_ws(websocket: WebSocket, job, subscribers):
     await websocket.accept()
     print(f"WebSocket client connected from {websocket.client.host}:{websocket.client.port}")
-    
+
     # Add to active connections
-    active_websockets.add(websocket)
-    
+    subscribers.add(websocket)
+    METRICS.add("websocket_clients", 1)
+
     try:
         # Send any cached perspectives to the new client
-        if perspective_cache:
-            print(f"Sending cached perspectives to new client: {len(perspective_cache)} color groups")
-            for color, perspectives in perspective_cache.items():
+        if job is not None and job.perspective_cache:
+            print(f"Sending cached perspectives to new client: {len(job.perspective_cache)} color groups")
+            for color, perspectives in list(job.perspective_cache.items()):
                 try:
                     await websocket.send_json({
                         "color": color,
@@ -235,7 +671,7 @@ async def perspectives_ws(websocket: WebSocket):
                     print(f"Sent {len(perspectives)} {color} perspectives to client")
                 except Exception as e:
                     print(f"Error sending {color} perspectives to client: {e}")
-        
+
         # Keep the connection alive
         while True:
             try:
@@ -258,22 +694,99 @@ async def perspectives_ws(websocket: WebSocket):
         print(f"WebSocket connection error: {str(e)}")
     finally:
         # Remove from active connections
-        active_websockets.remove(websocket)
+        subscribers.discard(websocket)
+        METRICS.add("websocket_clients", -1)
         print("WebSocket connection closed")
 
+def _sse_message(event):
+    event_id, kind, data = event
+    return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def _is_terminal(event):
+    return event[1] == "status" and event[2]["stage"] in ("done", "error")
+
+async def _sse_stream(job, last_event_id):
+    # Subscribe before replaying so nothing published in between is lost.
+    # Queue items only wake the stream up: every wake-up sends the log from
+    # last_event_id on, so events are always delivered in order without gaps
+    subscriber = asyncio.Queue()
+    job.sse_queues.add(subscriber)
+    try:
+        yield "retry: 3000\n\n"
+        for event in job.events_since(last_event_id):
+            yield _sse_message(event)
+            last_event_id = event[0]
+        if job.events and _is_terminal(job.events[-1]) and last_event_id >= job.events[-1][0]:
+            return
+
+        while True:
+            try:
+                await asyncio.wait_for(subscriber.get(), timeout=15)
+            except asyncio.TimeoutError:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keepalive\n\n"
+                continue
+            while not subscriber.empty():
+                subscriber.get_nowait()
+            for event in job.events_since(last_event_id):
+                yield _sse_message(event)
+                last_event_id = event[0]
+                if _is_terminal(event):
+                    return
+    finally:
+        job.sse_queues.discard(subscriber)
+
+def _sse_response(request, job, last_event_id):
+    # EventSource sends Last-Event-ID on reconnect; the query parameter lets a
+    # client resume on its first connection too
+    header = request.headers.get("last-event-id") or last_event_id
+    try:
+        resume_from = max(0, int(header)) if header else 0
+    except ValueError:
+        resume_from = 0
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(_sse_stream(job, resume_from), media_type="text/event-stream", headers=headers)
+
+@app.get("/events")
+def perspective_events(request: Request, last_event_id: str = None):
+    job = JOBS.latest()
+    if job is None:
+        return JSONResponse({"error": "no jobs"}, status_code=404)
+    return _sse_response(request, job, last_event_id)
+
+@app.get("/events/{job_id}")
+def job_perspective_events(job_id: str, request: Request, last_event_id: str = None):
+    job, error = _job_or_404(job_id)
+    return error or _sse_response(request, job, last_event_id)
+
+@app.websocket("/ws/perspectives")
+async def perspectives_ws(websocket: WebSocket):
+    # Unscoped clients follow whichever job is the most recent one
+    await _perspectives_ws(websocket, JOBS.latest(), latest_websockets)
+
+@app.websocket("/ws/perspectives/{job_id}")
+async def job_perspectives_ws(websocket: WebSocket, job_id: str):
+    job = JOBS.get(job_id)
+    if job is None:
+        await websocket.close(code=4404)
+        return
+    await _perspectives_ws(websocket, job, job.websockets)
+
 # Broadcast perspectives to all connected WebSocket clients
-async def broadcast_perspectives(color, perspectives):
+async def broadcast_perspectives(job, color, perspectives):
     if perspectives:
-        # Cache the perspectives
-        perspective_cache[color] = perspectives
-        
-        # Send to all connected clients
-        for websocket in list(active_websockets):
+        # Send to the job's clients and, for the newest job, to unscoped clients
+        subscribers = set(job.websockets)
+        if JOBS.latest() is job:
+            subscribers |= latest_websockets
+        message = {"color": color, "perspectives": perspectives}
+
+        async def send(websocket):
             try:
-                await websocket.send_json({
-                    "color": color,
-                    "perspectives": perspectives
-                })
+                await asyncio.wait_for(websocket.send_json(message), timeout=10)
             except Exception as e:
                 print(f"Error sending to WebSocket client: {str(e)}")
                 # Don't remove here, let the connection handler do it
+
+        # A slow client must not hold up the others
+        await asyncio.gather(*(send(ws) for ws in subscribers))